@@ -3,7 +3,7 @@ from fastapi import FastAPI
 import datetime
 import time
 from utils import validate_prediction
-from model import predict
+from model import predict, get_topic_index
 from loguru import logger
 from pydantic import BaseModel
 
@@ -18,6 +18,7 @@ class MedicalStatementResponseDto(BaseModel):
     statement_topic: int
 
 app = FastAPI()
+get_topic_index()  # Build the topic index at startup, not on the first request
 start_time = time.time()
 
 @app.get('/api')
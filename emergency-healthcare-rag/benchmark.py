@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from model import match_topic
+from topic_index import load_topic_index
+from utils import load_statement_sample
+
+'''
+Per-call latency and accuracy of topic matching on the training statements, before (the
+original baseline that re-reads data/topics.json on every call) and after (the topic index).
+
+    python benchmark.py --repeat 5
+'''
+
+
+def legacy_match_topic(statement: str) -> int:
+    """The original match_topic, kept for comparison."""
+    with open('data/topics.json', 'r') as f:
+        topics = json.load(f)
+
+    statement_lower = statement.lower()
+    best_topic = 0
+    max_matches = 0
+
+    for topic_name, topic_id in topics.items():
+        keywords = topic_name.lower().replace('_', ' ').replace('(', '').replace(')', '').split()
+        matches = sum(1 for keyword in keywords if keyword in statement_lower)
+        if matches > max_matches:
+            max_matches = matches
+            best_topic = topic_id
+
+    return best_topic
+
+
+def measure(function, samples, repeat: int) -> dict:
+    """Time every call and score the predicted topics."""
+    latencies = []
+    correct = 0
+    for _ in range(repeat):
+        for statement, answer in samples:
+            started = time.perf_counter()
+            topic = function(statement)
+            latencies.append((time.perf_counter() - started) * 1e6)
+            correct += topic == answer["statement_topic"]
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+        "accuracy": correct / len(latencies),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark topic matching before and after the topic index.")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the training statements")
+    args = parser.parse_args()
+
+    statement_ids = sorted(name[len("statement_"):-len(".txt")] for name in os.listdir("data/train/statements"))
+    samples = [load_statement_sample(statement_id) for statement_id in statement_ids]
+
+    match_topic(samples[0][0])  # Build the index before timing, as the API does at startup
+    results = {
+        "before": measure(legacy_match_topic, samples, args.repeat),
+        "after": measure(match_topic, samples, args.repeat),
+    }
+    print(f"{len(samples)} statements x {args.repeat}")
+    print(f"{'':<8}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'accuracy':>10}")
+    for name, result in results.items():
+        print(f"{name:<8}{result['mean_us']:>10.1f}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}{result['accuracy']:>10.3f}")
+    print(f"speedup {results['before']['mean_us'] / results['after']['mean_us']:.0f}x")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "topic_index.json")
+        started = time.perf_counter()
+        load_topic_index(cache_path=cache_path)
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        load_topic_index(cache_path=cache_path)
+        loaded = time.perf_counter() - started
+    print(f"index build {built * 1000:.2f} ms, load from cache {loaded * 1000:.2f} ms")
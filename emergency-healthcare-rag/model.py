@@ -1,5 +1,10 @@
-import json
+from functools import lru_cache
 from typing import Tuple
+from topic_index import TopicIndex, load_topic_index
+
+TOPICS_PATH = 'data/topics.json'
+# Set to a file path to keep the built topic index on disk between restarts
+TOPIC_INDEX_CACHE = None
 
 ### CALL YOUR CUSTOM MODEL VIA THIS FUNCTION ###
 def predict(statement: str) -> Tuple[int, int]:
@@ -25,24 +30,15 @@ def predict(statement: str) -> Tuple[int, int]:
 def match_topic(statement: str) -> int:
     """
     Simple keyword matching to find the best topic match.
+
+    Looks up the statement's tokens in the topic index, which is built once on the first
+    call instead of re-reading data/topics.json for every statement.
     """
-    # Load topics mapping
-    with open('data/topics.json', 'r') as f:
-        topics = json.load(f)
-    
-    statement_lower = statement.lower()
-    best_topic = 0
-    max_matches = 0
-    
-    for topic_name, topic_id in topics.items():
-        # Extract keywords from topic name
-        keywords = topic_name.lower().replace('_', ' ').replace('(', '').replace(')', '').split()
-        
-        # Count keyword matches in statement
-        matches = sum(1 for keyword in keywords if keyword in statement_lower)
-        
-        if matches > max_matches:
-            max_matches = matches
-            best_topic = topic_id
-    
-    return best_topic
+    return get_topic_index().match(statement)
+
+@lru_cache(maxsize=None)
+def get_topic_index() -> TopicIndex:
+    """
+    Return the topic index, built (or loaded from TOPIC_INDEX_CACHE) on the first call.
+    """
+    return load_topic_index(TOPICS_PATH, TOPIC_INDEX_CACHE)
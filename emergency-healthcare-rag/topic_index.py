@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+INDEX_VERSION = 1
+STOP_WORDS = {"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"}
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> List[str]:
+    """
+    Split text into normalized tokens.
+
+    Text is lower-cased and split on anything that is not a letter or a digit, so
+    "Acute Myocardial Infarction (STEMI_NSTEMI)" gives acute, myocardial, infarction,
+    stemi and nstemi. Stop words are dropped and a plural "s" is removed (burns -> burn),
+    but not from words ending in "ss", "is" or "us" (pancreatitis stays as it is).
+
+    Args:
+        text (str): The text to tokenize
+
+    Returns:
+        List[str]: The normalized tokens, in order
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "is", "us")):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class TopicIndex:
+    """
+    Inverted index from normalized keyword to the topics whose name contains it.
+
+    A statement is matched by looking up each of its distinct tokens once. The topic with
+    the most matching keywords wins, ties go to the topic listed first in topics.json, and
+    0 is returned when nothing matches, like the original keyword baseline.
+    """
+
+    def __init__(self, topics: Dict[str, int], source: str = ""):
+        """
+        Build the index.
+
+        Args:
+            topics (Dict[str, int]): Topic names mapped to topic IDs, as in data/topics.json
+            source (str): Hash of the topics file the index was built from, for the disk cache
+        """
+        self.source = source
+        self.order = {topic_id: position for position, topic_id in enumerate(topics.values())}
+        self.keywords: Dict[str, List[int]] = defaultdict(list)
+        for name, topic_id in topics.items():
+            for keyword in dict.fromkeys(normalize(name)):
+                self.keywords[keyword].append(topic_id)
+        self.keywords = dict(self.keywords)
+
+    def match(self, statement: str) -> int:
+        """
+        Find the topic of a statement.
+
+        Args:
+            statement (str): The medical statement
+
+        Returns:
+            int: The best matching topic ID, 0 if no keyword matches
+        """
+        matches: Dict[int, int] = {}
+        keywords = self.keywords
+        for token in set(normalize(statement)):
+            for topic_id in keywords.get(token, ()):
+                matches[topic_id] = matches.get(topic_id, 0) + 1
+        if not matches:
+            return 0
+        order = self.order
+        return min(matches, key=lambda topic_id: (-matches[topic_id], order[topic_id]))
+
+    def save(self, path: str):
+        """Write the index to a JSON file."""
+        with open(path, "w") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "source": self.source,
+                "order": list(self.order),
+                "keywords": self.keywords,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "TopicIndex":
+        """Read an index written by save."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} holds index version {data.get('version')}, expected {INDEX_VERSION}")
+        index = cls.__new__(cls)
+        index.source = data["source"]
+        index.order = {topic_id: position for position, topic_id in enumerate(data["order"])}
+        index.keywords = data["keywords"]
+        return index
+
+
+def load_topic_index(topics_path: str = "data/topics.json", cache_path: Optional[str] = None) -> TopicIndex:
+    """
+    Build the topic index, or load it from the cache file if it was built from the same topics.
+
+    Args:
+        topics_path (str): Path of the topic mapping
+        cache_path (Optional[str]): Where to keep the built index on disk (not cached if None)
+
+    Returns:
+        TopicIndex: The index
+    """
+    with open(topics_path, "rb") as f:
+        raw = f.read()
+    source = hashlib.sha256(raw).hexdigest()
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            index = TopicIndex.load(cache_path)
+            if index.source == source:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass  # Rebuilt and rewritten below
+
+    index = TopicIndex(json.loads(raw), source)
+    if cache_path:
+        index.save(cache_path)
+    return index
@@ -1,30 +1,71 @@
+import json
 import time
 import uvicorn
 import datetime
-from fastapi import Body, FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
 from dtos import RaceCarPredictRequestDto, RaceCarPredictResponseDto
-from example import return_action
+from inference import BatchedPredictor, encoded, load_policy, per_state
+from src.game.features import ENCODER, check_request
+from src.game.planning import HorizonPlanner
 
 HOST = "0.0.0.0"
 PORT = 9052
 
+# module:function taking one request dict, or a list of them if BATCH_POLICY is True
+POLICY = "example:return_action"
+BATCH_POLICY = False
+# Call the policy with the float32 feature vector of src.game.features (a matrix if BATCH_POLICY) instead of the request dict
+FEATURE_POLICY = False
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 1.0
+# Roll the policy ahead on a kinematic approximation of the game and return up to this many actions per request
+# (0 disables). Opt-in: the approximation does not see unsensed or newly spawned cars, so planned actions can miss
+# a car, and the rollout runs per request on the inference thread, giving up micro-batching. See the README.
+MAX_PLANNED_ACTIONS = 0
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the policy once, not per request
+    policy = load_policy(POLICY)
+    if FEATURE_POLICY:
+        policy = encoded(policy, ENCODER, batch=BATCH_POLICY)
+    app.state.planner = None
+    if MAX_PLANNED_ACTIONS and not BATCH_POLICY:
+        policy = app.state.planner = HorizonPlanner(policy, max_actions=MAX_PLANNED_ACTIONS)
+    app.state.predictor = BatchedPredictor(policy if BATCH_POLICY else per_state(policy), MAX_BATCH_SIZE, MAX_WAIT_MS)
+    await app.state.predictor.start()
+    yield
+    await app.state.predictor.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 start_time = time.time()
 
-@app.post('/predict', response_model=RaceCarPredictResponseDto)
-def predict(request: RaceCarPredictRequestDto = Body(...)):
-    action = return_action(request.dict())
-    return RaceCarPredictResponseDto(
-        action_type=action['action_type'],
-        actions=action['actions']
-    )
+@app.post('/predict', response_model=RaceCarPredictResponseDto,
+          openapi_extra={"requestBody": {"content": {"application/json": {"schema": RaceCarPredictRequestDto.model_json_schema()}}, "required": True}})
+async def predict(request: Request, response: Response):
+    # Parsed as plain JSON: the policy reads the dict (or its feature vector) directly, nested model validation only costs time
+    try:
+        state = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Request body is not valid JSON")
+    try:
+        check_request(state)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    actions, latency = await app.state.predictor.predict(state)
+    response.headers["X-Inference-Time-Ms"] = f"{latency:.3f}"
+    return RaceCarPredictResponseDto(actions=actions)
 
 @app.get('/api')
 def hello():
     return {
         "service": "race-car-usecase",
-        "uptime": '{}'.format(datetime.timedelta(seconds=time.time() - start_time))
+        "uptime": '{}'.format(datetime.timedelta(seconds=time.time() - start_time)),
+        "inference": app.state.predictor.metrics(),
+        "planning": app.state.planner.metrics() if app.state.planner else None
     }
 
 
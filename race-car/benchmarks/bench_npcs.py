@@ -0,0 +1,72 @@
+"""
+Benchmark and check of the batch NPC update (BatchRaceSimulation.update_npcs).
+
+Plays the same games with the NumPy code and, if numba is installed, with the compiled
+kernel of src.game.kernels, asserts that both give identical cars, sensors and crashes,
+and reports the time update_npcs takes per tick in each mode. Run from the race-car folder:
+
+    python -m benchmarks.bench_npcs --games 1000 --ticks 300
+"""
+import argparse
+import time
+import numpy as np
+from src.game.batch import BatchRaceSimulation
+from src.game.kernels import npc_tick
+
+STATE = ["npc_x", "npc_y", "npc_vx", "npc_lane", "npc_active", "npc_seq", "lane_slots", "bucket_size",
+         "jitter_counters", "spawn_counters", "ego_y", "distance", "crashed", "ticks", "readings"]
+
+
+def check(games: int, ticks: int):
+    """Play games in "streams" mode with the NumPy code and with the kernel, and assert they match."""
+    reference = BatchRaceSimulation(list(range(games)), rng_mode="streams")
+    compiled = BatchRaceSimulation(list(range(games)), rng_mode="streams")
+    reference.use_kernel = False
+    rng = np.random.default_rng(0)
+    for tick in range(ticks):
+        actions = rng.integers(0, 5, games).astype(np.int8)
+        reference.step(actions)
+        compiled.step(actions)
+        for name in STATE:
+            assert np.array_equal(getattr(reference, name), getattr(compiled, name), equal_nan=name == "readings"), \
+                f"{name} differs at tick {tick + 1}"
+
+
+def measure(games: int, ticks: int, rng_mode: str, use_kernel: bool) -> float:
+    """Return the mean time of update_npcs per tick in ms."""
+    sim = BatchRaceSimulation(list(range(games)), rng_mode=rng_mode)
+    sim.use_kernel = use_kernel
+    actions = np.zeros(games, dtype=np.int8)
+    sim.update_npcs(~sim.done)  # Compiles the kernel on first use
+    total = 0.0
+    for _ in range(ticks):
+        alive = ~sim.done
+        sim.handle_actions(actions, alive)
+        started = time.perf_counter()
+        sim.update_npcs(alive)
+        total += time.perf_counter() - started
+        sim.ticks[alive] += 1
+    return total / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the batch NPC update.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=300)
+    args = parser.parse_args()
+
+    runs = [("compat", False), ("streams", False)]
+    if npc_tick is None:
+        print("numba is not installed, only the NumPy code is timed")
+    else:
+        check(min(args.games, 200), args.ticks)
+        print(f"kernel matches the NumPy code over {min(args.games, 200)} games x {args.ticks} ticks")
+        runs.append(("streams", True))
+
+    print(f"{'mode':<10}{'code':<8}{'ms/tick':>10}   ({args.games} games)")
+    for rng_mode, use_kernel in runs:
+        print(f"{rng_mode:<10}{'numba' if use_kernel else 'numpy':<8}{measure(args.games, args.ticks, rng_mode, use_kernel):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark of the simulator tick (update_game plus collision checks).
+
+Runs fixed seeds and action scripts and reports ticks per second, the time spent in each
+phase of a tick and the memory allocated per tick. Results are written as JSON so runs
+from different commits can be compared. Run from the race-car folder:
+
+    python -m benchmarks.bench_simulator --output bench.json
+    python -m benchmarks.bench_simulator --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from src.game import core
+
+PHASES = ["handle_action", "update_cars", "remove_passed_cars", "place_car", "sensors", "collisions"]
+SCRIPTS = {
+    "cruise": lambda tick, rng: "NOTHING",
+    "accelerate": lambda tick, rng: "ACCELERATE",
+    "weave": lambda tick, rng: ("STEER_LEFT", "NOTHING", "STEER_RIGHT", "NOTHING")[(tick // 30) % 4],
+    "random": lambda tick, rng: rng.choice(core.ACTIONS),
+}
+
+
+def start_game(seed_value, script: str):
+    """Set up a fresh STATE and return the action function for the script."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        core.initialize_game_state("", seed_value)
+    rng = random.Random(f"{seed_value}/{script}")
+    return lambda tick: SCRIPTS[script](tick, rng)
+
+
+def measure_speed(seed_value, script: str, ticks: int) -> float:
+    """Return ticks per second of update_game plus collision checks, without instrumentation."""
+    action = start_game(seed_value, script)
+    actions = [action(tick) for tick in range(ticks)]
+    started = time.perf_counter()
+    for tick in range(ticks):
+        core.update_game(actions[tick])
+        core.STATE.check_collisions()
+    return ticks / (time.perf_counter() - started)
+
+
+def measure_phases(seed_value, script: str, ticks: int) -> dict:
+    """Return the mean time per tick of every phase in microseconds."""
+    action = start_game(seed_value, script)
+    totals = dict.fromkeys(PHASES, 0)
+    clock = time.perf_counter_ns
+    state = core.STATE
+    for tick in range(ticks):
+        current_action = action(tick)
+        t0 = clock()
+        core.handle_action(current_action)
+        state.distance += state.ego.velocity.x
+        t1 = clock()
+        core.update_cars()
+        t2 = clock()
+        core.remove_passed_cars()
+        t3 = clock()
+        core.place_car()
+        t4 = clock()
+        state.update_sensors()
+        t5 = clock()
+        state.check_collisions()
+        t6 = clock()
+        for phase, elapsed in zip(PHASES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5)):
+            totals[phase] += elapsed
+    return {phase: total / ticks / 1000 for phase, total in totals.items()}
+
+
+def measure_allocations(seed_value, script: str, ticks: int) -> dict:
+    """
+    Return the memory allocated per tick.
+
+    peak_bytes is the mean of the highest traced memory during a tick above the level at its
+    start (the short-lived garbage a tick creates), net_blocks the mean change in live blocks.
+    """
+    action = start_game(seed_value, script)
+    actions = [action(tick) for tick in range(ticks)]
+    peak_bytes = 0
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for tick in range(ticks):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        core.update_game(actions[tick])
+        core.STATE.check_collisions()
+        peak_bytes += tracemalloc.get_traced_memory()[1] - current
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    return {"peak_bytes": peak_bytes / ticks, "net_blocks": (blocks_after - blocks_before) / ticks}
+
+
+def run(seeds, scripts, ticks: int) -> dict:
+    results = []
+    for script in scripts:
+        for seed_value in seeds:
+            results.append({
+                "seed": seed_value,
+                "script": script,
+                "ticks": ticks,
+                "ticks_per_sec": measure_speed(seed_value, script, ticks),
+                "phase_us_per_tick": measure_phases(seed_value, script, ticks),
+                "allocations_per_tick": measure_allocations(seed_value, script, ticks),
+            })
+
+    summary = {
+        "ticks_per_sec": sum(r["ticks_per_sec"] for r in results) / len(results),
+        "phase_us_per_tick": {
+            phase: sum(r["phase_us_per_tick"][phase] for r in results) / len(results) for phase in PHASES
+        },
+        "peak_bytes_per_tick": sum(r["allocations_per_tick"]["peak_bytes"] for r in results) / len(results),
+    }
+    return {"meta": metadata(), "summary": summary, "results": results}
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def print_report(report: dict):
+    print(f"{'script':<12}{'seed':>8}{'ticks/s':>10}" + "".join(f"{phase:>20}" for phase in PHASES) + f"{'peak B/tick':>13}")
+    for r in report["results"]:
+        phases = "".join(f"{r['phase_us_per_tick'][phase]:>18.1f}us" for phase in PHASES)
+        print(f"{r['script']:<12}{str(r['seed']):>8}{r['ticks_per_sec']:>10.0f}{phases}{r['allocations_per_tick']['peak_bytes']:>13.0f}")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Print the change of every summary number against a baseline run.
+
+    :return: False if ticks/sec dropped or a phase slowed down by more than the tolerance factor.
+    """
+    ok = True
+    rows = [("ticks_per_sec", baseline["summary"]["ticks_per_sec"], report["summary"]["ticks_per_sec"], True)]
+    rows += [
+        (f"{phase} us", baseline["summary"]["phase_us_per_tick"][phase], report["summary"]["phase_us_per_tick"][phase], False)
+        for phase in PHASES
+    ]
+    rows.append(("peak B/tick", baseline["summary"]["peak_bytes_per_tick"], report["summary"]["peak_bytes_per_tick"], False))
+
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, old, new, higher_is_better in rows:
+        ratio = new / old if old else float("inf")
+        slower = ratio < 1 / tolerance if higher_is_better else ratio > tolerance
+        flag = "  REGRESSION" if slower and not name.startswith("peak") else ""
+        ok &= not flag
+        print(f"{name:<24}{old:>12.1f}{new:>12.1f}{ratio:>8.2f}x{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", nargs="+", default=["1", "2", "3"])
+    parser.add_argument("--scripts", nargs="+", default=list(SCRIPTS), choices=list(SCRIPTS))
+    parser.add_argument("--ticks", type=int, default=core.MAX_TICKS)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Slowdown factor reported as a regression")
+    args = parser.parse_args()
+
+    report = run(args.seeds, args.scripts, args.ticks)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Microbenchmark of the vector and collision math used by the sensors.
+
+Compares the allocating Vector/Line code path with the in-place, precomputed-rotation and
+plain-number variants. Run from the race-car folder:
+
+    python -m benchmarks.bench_vector
+"""
+import math
+import timeit
+import pygame
+from src.mathematics.vector import Vector, rotation
+from src.mathematics.collision import Line, get_intersection_point, get_lines_of_rectangle, segment_rectangle_distance
+
+NUMBER = 200_000
+
+
+def rotate_uncached(v: Vector, degrees: float) -> Vector:
+    # The rotation as it was written before the cos/sin cache
+    radians = math.radians(degrees)
+    return Vector(
+        math.cos(radians) * v.x - math.sin(radians) * v.y,
+        math.sin(radians) * v.x + math.cos(radians) * v.y
+    )
+
+
+def beam_vs_box_lines(start: Vector, end: Vector, box: pygame.Rect):
+    sensor_line = Line(start, end)
+    min_distance = None
+    for line in get_lines_of_rectangle(box):
+        intersection = get_intersection_point(sensor_line, line)
+        if intersection:
+            distance = start.distance(intersection)
+            if min_distance is None or distance < min_distance:
+                min_distance = distance
+    return min_distance
+
+
+def beam_vs_lines_preallocated(start: Vector, sensor_line: Line, lines, point: Vector):
+    min_distance = None
+    for line in lines:
+        if get_intersection_point(sensor_line, line, point) is not None:
+            distance = start.distance(point)
+            if min_distance is None or distance < min_distance:
+                min_distance = distance
+    return min_distance
+
+
+def main():
+    v = Vector(0, -1000)
+    w = Vector(3, 4)
+    cos, sin = rotation(67.5)
+    start = Vector(800, 600)
+    end = start.add(v.rotate(67.5))
+    beam_x, beam_y = end.x - start.x, end.y - start.y
+    box = pygame.Rect(1200, 200, 360, 179)
+    sensor_line = Line(start, end)
+    box_lines = get_lines_of_rectangle(box)
+    point = Vector()
+
+    cases = [
+        ("rotate, cos/sin per call", lambda: rotate_uncached(v, 67.5)),
+        ("rotate, cached cos/sin", lambda: v.rotate(67.5)),
+        ("rotate_by, precomputed", lambda: v.rotate_by(cos, sin)),
+        ("irotate_by, in place", lambda: w.irotate_by(cos, sin)),
+        ("add, new Vector", lambda: v.add(w)),
+        ("iadd, in place", lambda: w.iadd(v).isub(v)),
+        ("beam vs box, Vector/Line objects", lambda: beam_vs_box_lines(start, end, box)),
+        ("beam vs box, preallocated lines/out", lambda: beam_vs_lines_preallocated(start, sensor_line, box_lines, point)),
+        ("beam vs box, plain numbers", lambda: segment_rectangle_distance(
+            start.x, start.y, beam_x, beam_y, box.left, box.top, box.right, box.bottom)),
+    ]
+
+    assert beam_vs_box_lines(start, end, box) == beam_vs_lines_preallocated(start, sensor_line, box_lines, point)
+    assert beam_vs_box_lines(start, end, box) == segment_rectangle_distance(
+        start.x, start.y, beam_x, beam_y, box.left, box.top, box.right, box.bottom)
+
+    print(f"{'case':<40}{'ns/call':>10}")
+    for name, fn in cases:
+        seconds = min(timeit.repeat(fn, number=NUMBER, repeat=3))
+        print(f"{name:<40}{seconds / NUMBER * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
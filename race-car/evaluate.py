@@ -0,0 +1,78 @@
+import argparse
+import csv
+import os
+import time
+from functools import partial
+from inference import encoded, load_policy
+from src.game.evaluation import evaluate, play, summarize, format_table
+from src.game.features import ENCODER
+from src.game.render import FrameExporter
+from src.game.scenario import default_scenario, load_scenarios
+
+
+'''
+Score a policy over many seeds without the pygame window or the 60 FPS clock.
+
+    python evaluate.py --policy example:return_action --seeds 0:500
+
+The policy is given as module:function and is called with the same dict as /predict.
+'''
+
+def parse_seeds(values):
+    seeds = []
+    for value in values:
+        if ":" in value:
+            start, stop = value.split(":")
+            seeds.extend(range(int(start), int(stop)))
+        else:
+            seeds.append(int(value) if value.lstrip("-").isdigit() else value)
+    return seeds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluate a race-car policy over many seeds.")
+    parser.add_argument("--policy", default="example:return_action", help="module:function returning actions")
+    parser.add_argument("--features", action="store_true", help="Call the policy with the feature vector of src.game.features, like FEATURE_POLICY in api.py")
+    parser.add_argument("--seeds", nargs="+", default=["0:100"], help="Seeds or start:stop ranges")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--sensor-removal", type=int, default=0)
+    parser.add_argument("--scenarios", help="JSON file with one scenario or a list of them (default: the standard game)")
+    parser.add_argument("--csv", help="Write the per-seed results to this CSV file")
+    parser.add_argument("--record-crashes", metavar="DIR", help="Replay crashed seeds offscreen and write their frames to DIR")
+    parser.add_argument("--frame-stride", type=int, default=2, help="Record every n-th tick (default: 2)")
+    parser.add_argument("--frame-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), default=(400, 300))
+    parser.add_argument("--frame-format", choices=["npy", "png"], default="npy")
+    args = parser.parse_args()
+
+    seeds = parse_seeds(args.seeds)
+    policy = load_policy(args.policy)
+    if args.features:
+        policy = encoded(policy, ENCODER)
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else [default_scenario()]
+    results = []
+    for scenario in scenarios:
+        started = time.perf_counter()
+        scenario_results = evaluate(policy, seeds, args.processes, args.sensor_removal, scenario)
+        elapsed = time.perf_counter() - started
+        for result in scenario_results:
+            result["scenario"] = scenario.name
+        results.extend(scenario_results)
+
+        print(f"Scenario {scenario.name}")
+        print(format_table(summarize(scenario_results)))
+        print(f"Played {len(scenario_results)} games in {elapsed:.1f} s\n")
+
+        if args.record_crashes:
+            # Replays match the evaluation only for deterministic policies
+            for result in scenario_results:
+                if result["crashed"]:
+                    directory = os.path.join(args.record_crashes, scenario.name, f"seed_{result['seed']}")
+                    exporter = partial(FrameExporter, directory, resolution=args.frame_size, stride=args.frame_stride, format=args.frame_format)
+                    play(policy, result["seed"], args.sensor_removal, scenario, exporter)
+                    print(f"Recorded seed {result['seed']} to {directory}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
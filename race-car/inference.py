@@ -0,0 +1,182 @@
+import asyncio
+import importlib
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Tuple, Union
+
+
+'''
+Low-latency inference path for the /predict endpoint.
+
+Concurrent requests are queued and handed to the policy in micro-batches, so one model
+call serves every request that arrived within max_wait_ms. The model runs on a single
+dedicated thread, which keeps the event loop free to accept the next requests.
+'''
+
+Policy = Callable[[dict], Union[str, List[str]]]
+BatchPolicy = Callable[[List[dict]], List[Union[str, List[str]]]]
+
+
+def load_policy(spec: str):
+    """
+    Import a policy given as module:function (the function defaults to return_action).
+
+    :param spec: The policy, for example 'example:return_action'.
+    :return: The callable.
+    """
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name or "return_action")
+
+
+def per_state(policy: Policy) -> BatchPolicy:
+    """
+    Turn a policy taking one request dict into a policy taking a list of them.
+
+    A state the policy fails on gets its exception as result, so it only fails its own
+    request and not the rest of the batch.
+    """
+    def predict_batch(states: List[dict]) -> List[Union[str, List[str], Exception]]:
+        results = []
+        for state in states:
+            try:
+                results.append(policy(state))
+            except Exception as error:
+                results.append(error)
+        return results
+    return predict_batch
+
+
+def encoded(policy, encoder, batch: bool = False):
+    """
+    Feed a policy feature vectors instead of request dicts.
+
+    The result still takes request dicts, so it can be served, planned and evaluated like
+    any other policy. It is picklable if the policy is, for evaluation in worker processes.
+
+    :param policy: Maps one float32 feature vector to actions, or with batch a (N, features) matrix to one action list per row.
+    :param encoder: The FeatureEncoder used in training.
+    :param batch: Whether the policy takes the whole batch.
+    """
+    return partial(_call_encoded_batch if batch else _call_encoded, policy, encoder)
+
+
+def _call_encoded(policy, encoder, state: dict):
+    return policy(encoder.encode(state))
+
+
+def _call_encoded_batch(policy, encoder, states: List[dict]):
+    return policy(encoder.encode_many(states))
+
+
+class BatchedPredictor:
+    def __init__(self, predict_batch: BatchPolicy, max_batch_size: int = 64, max_wait_ms: float = 1.0, history: int = 10000):
+        """
+        Initialize a predictor that micro-batches concurrent requests.
+
+        :param predict_batch: Maps a list of request dicts to one action, action list or exception per request.
+        :param max_batch_size: The most requests served by one model call.
+        :param max_wait_ms: How long the first request of a batch waits for others to join.
+        :param history: The number of recent request latencies kept for the metrics.
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.latencies = deque(maxlen=history)
+        self.requests = 0
+        self.batches = 0
+
+    async def start(self):
+        """Start the batching worker on the running event loop."""
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and the model thread."""
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def predict(self, state: dict) -> Tuple[List[str], float]:
+        """
+        Queue one request and wait for its batch to be served.
+
+        :param state: The request dict, as sent to /predict.
+        :return: The actions and the time the request spent queued and in the model, in ms.
+        """
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((state, future))
+        actions = await future
+        latency = (time.perf_counter() - started) * 1000
+        self.latencies.append(latency)
+        return actions, latency
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            states = [state for state, _ in batch]
+            try:
+                results = list(await loop.run_in_executor(self.executor, self.predict_batch, states))
+                if len(results) != len(batch):
+                    raise ValueError(f"The policy returned {len(results)} results for {len(batch)} requests")
+            except Exception as error:
+                results = [error] * len(batch)
+
+            self.requests += len(batch)
+            self.batches += 1
+            # A bad result fails only its own request; the worker must survive it
+            for (_, future), actions in zip(batch, results):
+                if future.done():
+                    continue
+                try:
+                    if isinstance(actions, Exception):
+                        raise actions
+                    future.set_result([actions] if isinstance(actions, str) else list(actions))
+                except Exception as error:
+                    future.set_exception(error)
+
+    def metrics(self) -> dict:
+        """Return request counts, the mean batch size and latency percentiles in ms."""
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3)
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else None,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_p99": percentile(0.99),
+            "latency_ms_max": round(latencies[-1], 3) if latencies else None,
+        }
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+from evaluate import parse_seeds
+from src.game.core import RaceSimulation
+from src.game.evaluation import summarize, format_table
+from src.game.scenario import default_scenario, load_scenarios
+
+
+'''
+Local stand-in for the evaluation server: plays games with the simulator and asks a running
+/predict endpoint for actions over HTTP, the way the competition server does.
+
+    python api.py &
+    python local_eval.py --url http://localhost:9052 --games 32 --connections 8
+
+Every game runs at 60 ticks per second. Each tick pops one action from the game's list; when
+the list runs empty the game requests more and keeps repeating the last action until they
+arrive. Ticks played while waiting for a response are reported as lost ticks. With
+--lockstep the game waits for every response instead, which measures the throughput ceiling
+of the service without the 60 FPS clock.
+'''
+
+TICK_SECONDS = 1 / 60
+
+
+class ConnectionPool:
+    def __init__(self, url: str, size: int = 8, timeout: float = 10.0):
+        """
+        Initialize a pool of keep-alive HTTP/1.1 connections to one server.
+
+        Connections are opened on first use and reused for every following request. A
+        connection that fails is dropped and replaced on the next request.
+
+        :param url: The base URL of the server, for example http://localhost:9052.
+        :param size: The most connections open at once; further requests wait for a free one.
+        :param timeout: Seconds before a request is given up.
+        """
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"Only http:// URLs are supported, got {url!r}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def post_json(self, path: str, payload: dict) -> Tuple[int, dict, bytes, float]:
+        """
+        Send one POST request with a JSON body.
+
+        :param path: The endpoint path, for example /predict.
+        :param payload: The JSON body.
+        :return: The status code, the lower-cased response headers, the body and the round trip
+            in ms (from sending the request to reading the response, without waiting for a free connection).
+        """
+        if self._slots is None:
+            self._idle = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.size)
+        body = json.dumps(payload).encode()
+        head = (
+            f"POST {self.prefix}{path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n"
+        ).encode()
+        async with self._slots:
+            reader, writer = self._idle.get_nowait() if not self._idle.empty() else await self._connect()
+            started = time.perf_counter()
+            try:
+                writer.write(head + body)
+                await writer.drain()
+                status, headers, data = await asyncio.wait_for(self._read_response(reader), self.timeout)
+                elapsed = (time.perf_counter() - started) * 1000
+            except BaseException:
+                writer.close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._idle.put_nowait((reader, writer))
+        return status, headers, data, elapsed
+
+    async def close(self):
+        """Close every idle connection."""
+        while self._idle is not None and not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, dict, bytes]:
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            return status, headers, b"".join(chunks)
+        return status, headers, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+async def play(pool: ConnectionPool, seed_value, sensor_removal: int = 0, scenario=None, lockstep: bool = False) -> dict:
+    """
+    Play one game against the /predict endpoint.
+
+    :param pool: The connections to the server.
+    :param seed_value: The seed of the game.
+    :param sensor_removal: The number of random sensors removed from the ego car.
+    :param scenario: The Scenario to play (defaults to the standard game).
+    :param lockstep: Wait for every response instead of ticking at 60 FPS.
+    :return: The outcome of the game with its request latencies in ms.
+    """
+    loop = asyncio.get_running_loop()
+    sim = RaceSimulation(seed_value, sensor_removal, scenario=scenario)
+    queue = deque()
+    action = "NOTHING"
+    pending: Optional[asyncio.Task] = None
+    latencies, server_latencies = [], []
+    lost_ticks = errors = 0
+    max_lag = 0.0
+    next_tick = loop.time()
+
+    while not sim.done:
+        if not queue and pending is None:
+            pending = asyncio.create_task(_request(pool, sim.to_request()))
+        if pending is not None and (lockstep or pending.done()):
+            try:
+                actions, latency, server_latency = await pending
+                latencies.append(latency)
+                if server_latency is not None:
+                    server_latencies.append(server_latency)
+                queue.extend(actions)
+            except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                errors += 1
+            pending = None
+        if queue:
+            action = queue.popleft()
+        else:
+            lost_ticks += 1
+        sim.step(action)
+
+        if lockstep:
+            await asyncio.sleep(0)  # Let the other games and the connections run
+        else:
+            next_tick += TICK_SECONDS
+            delay = next_tick - loop.time()
+            max_lag = max(max_lag, -delay)
+            await asyncio.sleep(max(delay, 0))
+
+    if pending is not None:
+        pending.cancel()
+    return {
+        "seed": seed_value,
+        "distance": sim.distance,
+        "crashed": sim.crashed,
+        "ticks": sim.ticks,
+        "requests": len(latencies),
+        "errors": errors,
+        "lost_ticks": lost_ticks,
+        "max_tick_lag_ms": max_lag * 1000,
+        "latencies_ms": latencies,
+        "server_latencies_ms": server_latencies,
+    }
+
+
+async def _request(pool: ConnectionPool, state: dict) -> Tuple[List[str], float, Optional[float]]:
+    status, headers, body, latency = await pool.post_json("/predict", state)
+    if status != 200:
+        raise ValueError(f"/predict answered {status}: {body[:200]!r}")
+    data = json.loads(body)
+    actions = data.get("actions") if isinstance(data, dict) else None
+    if not isinstance(actions, list) or not all(isinstance(action, str) for action in actions):
+        raise ValueError(f"/predict answered without an action list: {body[:200]!r}")
+    server_latency = headers.get("x-inference-time-ms")
+    return actions, latency, float(server_latency) if server_latency else None
+
+
+async def run(url: str, seeds, concurrency: int, connections: int, sensor_removal: int = 0, scenario=None, lockstep: bool = False) -> dict:
+    """
+    Play every seed, concurrency games at a time, and summarize the service's latency.
+
+    :param url: The base URL of the service.
+    :param seeds: The seeds to play.
+    :param concurrency: The number of games played at the same time.
+    :param connections: The size of the connection pool.
+    :param sensor_removal: The number of random sensors removed from the ego car.
+    :param scenario: The Scenario to play (defaults to the standard game).
+    :param lockstep: Wait for every response instead of ticking at 60 FPS.
+    :return: The per-game results and the latency summary.
+    """
+    pool = ConnectionPool(url, connections)
+    games = asyncio.Semaphore(concurrency)
+
+    async def limited(seed_value):
+        async with games:
+            return await play(pool, seed_value, sensor_removal, scenario, lockstep)
+
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(limited(seed_value) for seed_value in seeds))
+    finally:
+        await pool.close()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result in results for latency in result["latencies_ms"])
+    server_latencies = sorted(latency for result in results for latency in result["server_latencies_ms"])
+    ticks = sum(result["ticks"] for result in results)
+    service = {
+        "requests": len(latencies),
+        "requests_per_sec": len(latencies) / elapsed,
+        "errors": sum(result["errors"] for result in results),
+        "connections_opened": pool.opened,
+        "lost_ticks": sum(result["lost_ticks"] for result in results),
+        "lost_tick_rate": sum(result["lost_ticks"] for result in results) / ticks if ticks else 0.0,
+        "max_tick_lag_ms": max((result["max_tick_lag_ms"] for result in results), default=0.0),
+        "elapsed_sec": elapsed,
+    }
+    for name, values in (("latency_ms", latencies), ("server_ms", server_latencies)):
+        for q in (0.50, 0.95, 0.99):
+            service[f"{name}_p{round(q * 100)}"] = _percentile(values, q)
+        service[f"{name}_max"] = values[-1] if values else None
+    return {"results": results, "service": service}
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play games against a running /predict endpoint like the evaluation server.")
+    parser.add_argument("--url", default="http://localhost:9052", help="Base URL of the service")
+    parser.add_argument("--seeds", nargs="+", default=["0:16"], help="Seeds or start:stop ranges")
+    parser.add_argument("--games", type=int, default=16, help="Games played at the same time")
+    parser.add_argument("--connections", type=int, default=8, help="Keep-alive connections in the pool")
+    parser.add_argument("--sensor-removal", type=int, default=0)
+    parser.add_argument("--scenario", help="JSON file with one scenario (default: the standard game)")
+    parser.add_argument("--lockstep", action="store_true", help="Wait for every response instead of ticking at 60 FPS")
+    parser.add_argument("--json", help="Write the per-game results and the summary to this file")
+    args = parser.parse_args()
+
+    scenario = load_scenarios(args.scenario)[0] if args.scenario else default_scenario()
+    report = asyncio.run(run(args.url, parse_seeds(args.seeds), args.games, args.connections, args.sensor_removal, scenario, args.lockstep))
+
+    print(format_table(summarize(report["results"])))
+    print()
+    for name, value in report["service"].items():
+        text = "-" if value is None else f"{value:.3f}" if isinstance(value, float) else str(value)
+        print(f"{name:<20}{text:>14}")
+    if report["service"]["max_tick_lag_ms"] > 1000 * TICK_SECONDS:
+        print("\nThis machine could not keep every game at 60 FPS; lower --games for exact lost-tick counts.")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -1,5 +1,8 @@
 import pygame
-from typing import Optional
+import random
+import struct
+from functools import lru_cache
+from typing import Optional, Tuple
 from ..mathematics.vector import Vector 
 from .road import Lane   
 from ..mathematics.randomizer import random_number
@@ -18,20 +21,24 @@ class Car:
         self.lane = lane
         self.x = 0
         self.y = 0
-        self.sprite = self.load_sprite(f"public/assets/{color}car.png", target_height)
+        self.sprite_path = f"public/assets/{color}car.png"
+        self.target_height = target_height
+        self.width, self.height = sprite_size(self.sprite_path, target_height)
+        self._sprite = None  # Loaded on first use, only rendering needs it
 
-    def update(self, ego: 'Car'):
+    def update(self, ego: 'Car', rng: Optional[random.Random] = None):
         """
         Update the car's position based on its velocity and the ego car's velocity.
 
         :param ego: The ego car (reference car).
+        :param rng: The random generator for the velocity jitter (optional, defaults to the global RNG).
         """
         if self == ego:
             self.y += self.velocity.y
             return
         self.x += self.velocity.x - ego.velocity.x 
         self.y += self.velocity.y
-        rn = random_number() - 0.5
+        rn = (rng.random() if rng is not None else random_number()) - 0.5
         velocity_change = 0.1 * rn + 1 
         self.velocity.x = velocity_change * self.velocity.x
 
@@ -66,37 +73,79 @@ class Car:
         """
         Load the car's sprite from the given file path.
 
+        Sprites are decoded and scaled once per path and height, and shared between cars.
+
         :param path: The file path to the sprite image.
         :param target_height: The target height to scale the sprite to.
         :return: The loaded sprite as a pygame.Surface.
         """
-        try:
-            sprite = pygame.image.load(path)
-            aspect_ratio = sprite.get_width() / sprite.get_height()
-            new_height = target_height
-            new_width = int(aspect_ratio * new_height)
-            sprite = pygame.transform.scale(sprite, (new_width, new_height))
-            return sprite
-        except pygame.error as e:
-            print(f"Error loading sprite: {e}")
-            return pygame.Surface((target_height, target_height))  # Return a placeholder surface if loading fails
+        return _load_sprite(path, target_height)
+
+    @property
+    def sprite(self) -> pygame.Surface:
+        """Return the car's sprite, loading it on first access."""
+        if self._sprite is None:
+            self._sprite = self.load_sprite(self.sprite_path, self.target_height)
+        return self._sprite
+
+    @sprite.setter
+    def sprite(self, sprite: pygame.Surface):
+        self._sprite = sprite
+        self.width, self.height = sprite.get_width(), sprite.get_height()
 
     @property
     def rect(self):
         """Return the pygame.Rect representing the car's current position and size."""
-        if self.sprite:
-            return pygame.Rect(
-                int(self.x),
-                int(self.y),
-                self.sprite.get_width(),
-                self.sprite.get_height()
-            )
-        else:
-            # Default size if sprite is missing
-            return pygame.Rect(int(self.x), int(self.y), 50, 50)
+        return pygame.Rect(int(self.x), int(self.y), self.width, self.height)
 
     def get_bounds(self) -> pygame.Rect:
         """
         Returns the bounding rectangle of the car for collision/sensor purposes.
         """
-        return self.rect
\ No newline at end of file
+        return self.rect
+
+
+def sprite_size(path: str, target_height: int) -> Tuple[int, int]:
+    """
+    Return the (width, height) of a sprite once scaled to the target height.
+
+    PNG sizes are read from the file header, so no image is decoded.
+
+    :param path: The file path to the sprite image.
+    :param target_height: The target height the sprite is scaled to.
+    :return: The scaled width and height in pixels.
+    """
+    size = _png_size(path)
+    if size is None:
+        sprite = _load_sprite(path, target_height)
+        return sprite.get_width(), sprite.get_height()
+    width, height = size
+    return int(width / height * target_height), target_height
+
+
+@lru_cache(maxsize=None)
+def _png_size(path: str) -> Optional[Tuple[int, int]]:
+    """Read the image size from a PNG header, or return None if the file is not a readable PNG."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", header[16:24])
+    return (width, height) if width and height else None
+
+
+@lru_cache(maxsize=None)
+def _load_sprite(path: str, target_height: int) -> pygame.Surface:
+    try:
+        sprite = pygame.image.load(path)
+        aspect_ratio = sprite.get_width() / sprite.get_height()
+        new_height = target_height
+        new_width = int(aspect_ratio * new_height)
+        sprite = pygame.transform.scale(sprite, (new_width, new_height))
+        return sprite
+    except (pygame.error, OSError) as e:
+        print(f"Error loading sprite: {e}")
+        return pygame.Surface((target_height, target_height))  # Return a placeholder surface if loading fails
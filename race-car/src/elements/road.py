@@ -27,8 +27,7 @@ class Road:
         self.lanes: List[Lane] = []
         self.walls: List[Wall] = []
 
-        self.surface = pygame.Surface((width, height))
-        self.build_background()
+        self._surface = None  # Drawn on first use, only rendering needs it
         self.build_lanes(self.lane_height)
 
         self.y_start = self.lanes[0].y_start
@@ -51,6 +50,16 @@ class Road:
     def random_lane(self) -> Lane:
         return self.lanes[int(random_number() * len(self.lanes))] 
 
+    @property
+    def surface(self) -> pygame.Surface:
+        """Return the road background with its lane lines, drawing it on first access."""
+        if self._surface is None:
+            self._surface = pygame.Surface((self._width, self._height))
+            self.build_background()
+            self.build_sidelines()
+            self.build_middle_lines()
+        return self._surface
+
     def build_background(self):
         """
         Build the road background.
@@ -64,9 +73,6 @@ class Road:
             y_end = y_start + lane_height
             self.lanes.append(Lane(y_start, y_end, f"Lane {i+1}"))
 
-        self.build_sidelines()
-        self.build_middle_lines()
-
     def build_sidelines(self):
         # Draw top and bottom sidelines
         self.draw_line(0, self.lanes[0].y_start, self._width, self._line_height, (255, 255, 255))
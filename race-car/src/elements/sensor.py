@@ -1,8 +1,11 @@
 import pygame
+import numpy as np
 from ..mathematics.vector import Vector  # Assuming a Vector class exists
-from typing import List, Optional
-from ..mathematics.collision import get_intersection_point, get_lines_of_rectangle  # Assuming collision utilities exist
+from typing import List, Optional, Tuple
+from ..mathematics.collision import segment_rectangle_distance
+from ..mathematics.raycast import cast_rays
 from .car import Car  # Assuming a Car class exists
+from ..game import profiling
 
 class Line:
     def __init__(self, start, end):
@@ -10,13 +13,15 @@ class Line:
         self.end = end
 
 class Sensor:
-    def __init__(self, car: Car, angle: float, name: str, state):
+    def __init__(self, car: Car, angle: float, name: str, state, strength: float = 1000, beam_vector: Optional[Tuple[float, float]] = None):
         """
         Initialize a Sensor object.
 
         :param car: The car to which the sensor is attached.
         :param angle: The angle of the sensor in degrees.
         :param name: The name of the sensor.
+        :param strength: The reach of the sensor in pixels.
+        :param beam_vector: The precomputed beam vector for this angle and strength (optional).
         """
         self.car = car
         self.name = name
@@ -25,17 +30,20 @@ class Sensor:
 
         self.sensor_width = 2
         self.sensor_color = (255, 0, 0)  # Red
-        self.sensor_strength = 1000
+        self.sensor_strength = strength
 
         # Calculate the sensor beam vector
-        vector = Vector(0, -self.sensor_strength).rotate(self.degrees)
+        if beam_vector is None:
+            vector = Vector(0, -self.sensor_strength).rotate(self.degrees)
+            beam_vector = (vector.x, vector.y)
 
         # Create the beam as a line
+        self.beam_vector = beam_vector
         self.beam_start = (0, 0)
-        self.beam_end = (vector.x, vector.y)
+        self.beam_end = beam_vector
 
         # Create a placeholder for text display
-        self.text_position = (vector.x * 0.3, vector.y * 0.3)
+        self.text_position = (beam_vector[0] * 0.3, beam_vector[1] * 0.3)
         self.text = ""
 
         self.state = state
@@ -43,29 +51,30 @@ class Sensor:
     def update(self):
         """
         Update the sensor's position, visibility, and reading.
-        """
-        # Update visibility based on global state
-        visible = self.state.sensors_enabled
 
+        Works on plain numbers with the beam vector computed once in __init__, so no
+        Vector or Line objects are allocated per tick.
+        """
         # Update position
-        car_rect = self.car.get_bounds()
-        car_center = Vector(car_rect.centerx, car_rect.centery)
-        self.beam_start = (car_center.x, car_center.y)
-        sensor_beam_end = car_center.add(Vector(0, -self.sensor_strength).rotate(self.degrees))
-        self.beam_end = (sensor_beam_end.x, sensor_beam_end.y)
-
-        # Reset reading
-        self.reading = None
-        sensor_line = Line(car_center, sensor_beam_end)
+        car = self.car
+        start_x = int(car.x) + car.width // 2
+        start_y = int(car.y) + car.height // 2
+        end_x = start_x + self.beam_vector[0]
+        end_y = start_y + self.beam_vector[1]
+        self.beam_start = (start_x, start_y)
+        self.beam_end = (end_x, end_y)
+        beam_x = end_x - start_x
+        beam_y = end_y - start_y
 
         min_reading = None
 
         # Sense cars
-        for car in self.state.cars:
-            if car == self.state.ego:
+        for other in self.state.cars:
+            if other == self.state.ego:
                 continue
-            bounds = car.get_bounds()
-            reading = self.get_sensor_reading_for_bounding_box(bounds, sensor_line, car_center)
+            left = int(other.x)
+            top = int(other.y)
+            reading = segment_rectangle_distance(start_x, start_y, beam_x, beam_y, left, top, left + other.width, top + other.height)
             if reading is not None and 0 <= reading <= self.sensor_strength:
                 if min_reading is None or reading < min_reading:
                     min_reading = reading
@@ -73,7 +82,7 @@ class Sensor:
         # Sense walls
         for wall in self.state.road.walls:
             bounds = wall.get_bounds()
-            reading = self.get_sensor_reading_for_bounding_box(bounds, sensor_line, car_center)
+            reading = segment_rectangle_distance(start_x, start_y, beam_x, beam_y, bounds.left, bounds.top, bounds.right, bounds.bottom)
             if reading is not None and 0 <= reading <= self.sensor_strength:
                 if min_reading is None or reading < min_reading:
                     min_reading = reading
@@ -86,37 +95,89 @@ class Sensor:
         else:
             self.text = ""
 
-    def get_sensor_reading_for_bounding_box(self, bb: pygame.Rect, sensor_line: dict, car_center: Vector) -> Optional[float]:
+    def get_sensor_reading_for_bounding_box(self, bb: pygame.Rect, sensor_line: Line, car_center: Vector) -> Optional[float]:
         """
         Calculate the sensor reading for a bounding box.
 
         :param bb: The bounding box as a pygame.Rect.
-        :param sensor_line: The sensor line as a dictionary with 'start' and 'end' keys.
+        :param sensor_line: The sensor line, starting at the car center.
         :param car_center: The center of the car as a Vector.
         :return: The distance to the closest intersection, or None if no intersection.
         """
-        lines = get_lines_of_rectangle(bb)
-        min_distance = None
-        for line in lines:
-            intersection = get_intersection_point(sensor_line, line)
-            if intersection:
-                distance = car_center.distance(intersection)
-                if min_distance is None or distance < min_distance:
-                    min_distance = distance
-        return min_distance
-
-    def draw(self, surface: pygame.Surface):
+        return segment_rectangle_distance(
+            car_center.x, car_center.y,
+            sensor_line.end.x - sensor_line.start.x, sensor_line.end.y - sensor_line.start.y,
+            bb.left, bb.top, bb.right, bb.bottom
+        )
+
+    def draw(self, surface: pygame.Surface, font: Optional[pygame.font.Font] = None) -> Optional[pygame.Rect]:
         """
         Draw the sensor beam and text on the given surface.
+
+        :param surface: The surface to draw on.
+        :param font: The font for the reading (defaults to the cached 16 pt monospace font).
+        :return: The area drawn, or None if sensors are disabled.
         """
         if self.state.sensors_enabled:
             # Draw the beam
-            pygame.draw.line(surface, self.sensor_color, self.beam_start, self.beam_end, self.sensor_width)
+            drawn = pygame.draw.line(surface, self.sensor_color, self.beam_start, self.beam_end, self.sensor_width)
 
             # Draw the text at 30% along the beam
             if self.text:
-                font = pygame.font.SysFont("monospace", 16)
+                if font is None:
+                    from ..game.render import get_font
+                    font = get_font("monospace", 16)
                 text_surface = font.render(self.text, True, (255, 255, 255))  # White text
                 text_x = self.beam_start[0] + 0.3 * (self.beam_end[0] - self.beam_start[0])
                 text_y = self.beam_start[1] + 0.3 * (self.beam_end[1] - self.beam_start[1])
-                surface.blit(text_surface, (text_x, text_y))
\ No newline at end of file
+                drawn = drawn.union(surface.blit(text_surface, (text_x, text_y)))
+            return drawn
+        return None
+
+
+def update_sensors(sensors: List[Sensor], state) -> np.ndarray:
+    """
+    Update all sensors of the ego car in one batched ray cast.
+
+    Gives the same readings as calling Sensor.update on every sensor, but intersects all
+    beams with all cars and walls in a single NumPy pass.
+
+    :param sensors: The sensors to update, all attached to the same car.
+    :param state: The game state holding the cars and the road.
+    :return: The readings in the order of sensors, NaN where a sensor sees nothing.
+    """
+    if not sensors:
+        return np.empty(0)
+
+    ego = sensors[0].car
+    center = (int(ego.x) + ego.width // 2, int(ego.y) + ego.height // 2)
+
+    # Car boxes come straight from the cached geometry, truncated to pixels like Car.rect.
+    # Cars entirely out of beam range are skipped, no sensor could read them.
+    reach = sensors[0].sensor_strength ** 2
+    boxes = []
+    for car in state.cars:
+        if car is ego:
+            continue
+        left, top = int(car.x), int(car.y)
+        dx = max(left - center[0], center[0] - left - car.width, 0)
+        dy = max(top - center[1], center[1] - top - car.height, 0)
+        if dx * dx + dy * dy <= reach:
+            boxes.append((left, top, car.width, car.height))
+    if profiling.PROFILER is not None:
+        profiling.PROFILER.count(profiling.CARS_SENSED, len(boxes))
+        profiling.PROFILER.count(profiling.INTERSECTION_TESTS, len(sensors) * (len(boxes) + len(state.road.walls)))
+    boxes += [(bb.x, bb.y, bb.width, bb.height) for bb in (wall.get_bounds() for wall in state.road.walls)]
+    boxes = np.array(boxes, dtype=np.float64)
+    # Beam ends are placed in screen coordinates first, like Sensor.update, so near-axis
+    # beams lose their rounding noise in the same way
+    ends = np.array([sensor.beam_vector for sensor in sensors]) + center
+    readings = cast_rays(np.array([center]), ends - center, boxes[None])[0]
+
+    for sensor, reading, end in zip(sensors, readings.tolist(), ends.tolist()):
+        sensor.beam_start = center
+        sensor.beam_end = tuple(end)
+        sensor.reading = None if reading != reading else reading  # NaN means no hit
+        sensor.text = f"{sensor.reading:.2f}" if sensor.reading is not None else ""
+
+    return readings
@@ -0,0 +1,391 @@
+import numpy as np
+from typing import Optional, Sequence
+from ..mathematics.randomizer import RandomStreams, counter_uniform, stream_key
+from ..mathematics.collision import swept_aabb
+from ..mathematics.raycast import cast_rays
+from .core import ACTIONS, SENSOR_OPTIONS, SENSOR_INDEX
+from .kernels import npc_tick
+from .scenario import Scenario, default_scenario
+
+NOTHING, ACCELERATE, DECELERATE, STEER_LEFT, STEER_RIGHT = range(len(ACTIONS))
+
+
+def encode_actions(actions: Sequence[str]) -> np.ndarray:
+    """
+    Convert a sequence of action names into an array of action codes.
+
+    :param actions: Action names such as 'ACCELERATE'. Unknown names map to 'NOTHING'.
+    :return: An int8 array of indices into ACTIONS.
+    """
+    codes = {name: code for code, name in enumerate(ACTIONS)}
+    return np.array([codes.get(action, NOTHING) for action in actions], dtype=np.int8)
+
+
+class BatchRaceSimulation:
+    def __init__(self, seeds: Sequence, sensor_removal: int = 0, scenario: Optional[Scenario] = None, rng_mode: str = "compat",
+                 continuous_collisions: bool = False):
+        """
+        Initialize N independent race-car games whose cars live in NumPy arrays.
+
+        Every game follows exactly the trajectory a RaceSimulation with the same seed
+        would follow. Sensor readings are kept for every entry of SENSOR_OPTIONS, with
+        NaN for sensors that see nothing or were removed. Finished games (crashed or out of ticks) are frozen until the
+        whole batch is done.
+
+        :param seeds: One seed per game.
+        :param sensor_removal: The number of random sensors removed from each ego car.
+        :param scenario: The road, traffic and sensor layout shared by all games (defaults to the standard game).
+        :param rng_mode: "compat" or "streams", like RaceSimulation. In "streams" mode the velocity
+            jitter of all cars of all games is drawn in one vectorized call.
+        :param continuous_collisions: Also sweep the movement within every tick, so fast cars cannot
+            pass through each other unnoticed. Off by default, to crash exactly like RaceSimulation.
+        """
+        self.scenario = scenario = scenario or default_scenario()
+        self.continuous_collisions = continuous_collisions
+        n = len(seeds)
+        k = scenario.npc_count  # Number of NPC cars per game
+        self.size = n
+        self.rngs = [RandomStreams(seed_value, rng_mode) for seed_value in seeds]
+
+        self.road = scenario.build_road()
+        self.lane_centers = np.array(scenario.lane_centers)
+        self.walls = np.array(scenario.walls)
+        sizes = scenario.car_sizes
+
+        # Ego car
+        ego_width, ego_height = sizes["yellow"]
+        middle_lane = self.road.middle_lane()
+        self.ego_w = np.full(n, ego_width, dtype=np.int64)
+        self.ego_h = np.full(n, ego_height, dtype=np.int64)
+        self.ego_x = np.full(n, (scenario.screen_width // 2) - (ego_width // 2), dtype=np.float64)
+        self.ego_y = np.full(n, int((middle_lane.y_start + middle_lane.y_end) / 2 - ego_height / 2), dtype=np.float64)
+        self.ego_vx = np.full(n, scenario.ego_speed, dtype=np.float64)
+        self.ego_vy = np.zeros(n, dtype=np.float64)
+
+        # NPC cars, one slot per car in the game's car bucket
+        self.npc_x = np.zeros((n, k), dtype=np.float64)
+        self.npc_y = np.zeros((n, k), dtype=np.float64)
+        self.npc_vx = np.full((n, k), scenario.npc_speed, dtype=np.float64)
+        self.npc_w = np.zeros((n, k), dtype=np.int64)
+        self.npc_h = np.zeros((n, k), dtype=np.int64)
+        self.npc_lane = np.full((n, k), -1, dtype=np.int64)
+        self.npc_active = np.zeros((n, k), dtype=bool)
+
+        # Bookkeeping that reproduces the list order of the scalar simulator: cars are kept in
+        # placement order (npc_seq) and the car bucket is a stack of slots
+        self.npc_seq = np.zeros((n, k), dtype=np.int64)
+        self.placed = np.zeros(n, dtype=np.int64)
+        self.bucket = np.tile(np.arange(k, dtype=np.int64), (n, 1))
+        self.bucket_size = np.full(n, k, dtype=np.int64)
+        self.lane_slots = np.full((n, scenario.lane_count), -1, dtype=np.int64)  # Slot driving in every lane, -1 if open
+
+        # Sensors, with a beam vector per entry of SENSOR_OPTIONS
+        self.sensor_names = [name for _, name in SENSOR_OPTIONS]
+        self.sensor_vectors = scenario.sensor_vectors
+        self.sensor_enabled = np.repeat(scenario.sensor_mask[None], n, axis=0)
+        self.readings = np.full((n, len(SENSOR_OPTIONS)), np.nan)
+
+        for g, rng in enumerate(self.rngs):
+            sensor_options = list(scenario.sensors)
+            for _ in range(sensor_removal):
+                removed = rng.sensors.choice(sensor_options)
+                sensor_options.remove(removed)
+                self.sensor_enabled[g, SENSOR_INDEX[removed[1]]] = False
+            for slot in range(k):
+                width, height = sizes[rng.colors.choice(scenario.npc_colors)]
+                self.npc_w[g, slot] = width
+                self.npc_h[g, slot] = height
+
+        self.jitter_keys = None  # Stream key and draw count of every car's jitter in "streams" mode
+        self.jitter_counters = None
+        self.spawn_keys = None  # Stream key and draw count of every game's spawn stream in "streams" mode
+        self.spawn_counters = None
+        if rng_mode == "streams":
+            self.jitter_keys = np.array([[stream_key(rng.key, "jitter", slot) for slot in range(k)] for rng in self.rngs], dtype=np.uint64).reshape(n, k)
+            self.jitter_counters = np.zeros((n, k), dtype=np.uint64)
+            self.spawn_keys = np.array([rng.spawn.key for rng in self.rngs], dtype=np.uint64)
+            self.spawn_counters = np.zeros(n, dtype=np.uint64)
+
+        # The compiled kernel draws from the counter-based streams, "compat" games always use NumPy
+        self.use_kernel = npc_tick is not None and rng_mode == "streams"
+
+        self.distance = np.zeros(n, dtype=np.float64)
+        self.crashed = np.zeros(n, dtype=bool)
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+    @property
+    def done(self) -> np.ndarray:
+        """Return a boolean array marking games that have crashed or used up their ticks."""
+        return self.crashed | (self.ticks >= self.scenario.max_ticks)
+
+    def handle_actions(self, actions: np.ndarray, alive: np.ndarray):
+        """
+        Apply one action code per game to the ego cars, like handle_action.
+
+        :param actions: Action codes (indices into ACTIONS), one per game.
+        :param alive: Mask of games that are still running.
+        """
+        accelerate = alive & (actions == ACCELERATE)
+        decelerate = alive & (actions == DECELERATE)
+        self.ego_vx[accelerate] += 0.1
+        self.ego_vx[decelerate] -= 0.1
+        self.ego_vx[decelerate & (self.ego_vx < 0)] = 0
+        self.ego_vy[alive & (actions == STEER_LEFT)] += -0.1
+        self.ego_vy[alive & (actions == STEER_RIGHT)] += 0.1
+
+    def update_cars(self, alive: np.ndarray):
+        """
+        Move every ego and NPC car by one tick and apply the NPC velocity jitter.
+
+        :param alive: Mask of games that are still running.
+        """
+        self.ego_y[alive] += self.ego_vy[alive]
+
+        moving = self.npc_active & alive[:, None]
+        self.npc_x[moving] += (self.npc_vx - self.ego_vx[:, None])[moving]
+
+        if self.jitter_keys is not None:
+            # Every car has its own counter-based stream, so all draws are made at once
+            draws = counter_uniform(self.jitter_keys[moving], self.jitter_counters[moving])
+            self.jitter_counters[moving] += 1
+            self.npc_vx[moving] = (0.1 * (draws - 0.5) + 1) * self.npc_vx[moving]
+            return
+
+        # The jitter draws come from each game's own generator in car-list order
+        games, slots = self.car_order(moving)
+        counts = np.bincount(games, minlength=self.size).tolist()
+        draws = []
+        for g in np.flatnonzero(alive).tolist():
+            draw = self.rngs[g].shared.random
+            draws += [draw() for _ in range(counts[g])]
+        self.npc_vx[games, slots] = (0.1 * (np.array(draws) - 0.5) + 1) * self.npc_vx[games, slots]
+
+    def car_order(self, mask: np.ndarray):
+        """
+        Return the NPC cars of a mask in the order of the scalar simulator's car lists.
+
+        :param mask: (games, slots) mask of cars.
+        :return: The game and slot indices, sorted by game and then by placement.
+        """
+        games, slots = np.nonzero(mask)
+        order = np.lexsort((self.npc_seq[games, slots], games))
+        return games[order], slots[order]
+
+    def remove_passed_cars(self, alive: np.ndarray):
+        """
+        Return NPC cars that drove too far from the ego car to their game's car bucket.
+
+        :param alive: Mask of games that are still running.
+        """
+        retire_distance = self.scenario.retire_distance
+        passed = self.npc_active & alive[:, None] & (
+            (self.npc_x < -retire_distance) | (self.npc_x > self.scenario.screen_width + retire_distance)
+        )
+        if not passed.any():
+            return
+        # Push the retired cars onto the bucket in car-list order
+        games, slots = self.car_order(passed)
+        rank = np.arange(games.size) - np.searchsorted(games, games)
+        self.bucket[games, self.bucket_size[games] + rank] = slots
+        self.bucket_size += np.bincount(games, minlength=self.size)
+        self.lane_slots[games, self.npc_lane[games, slots]] = -1
+        self.npc_active &= ~passed
+        self.npc_lane[passed] = -1
+
+    def place_cars(self, alive: np.ndarray):
+        """
+        Spawn a car from the bucket into a random open lane of every running game.
+
+        :param alive: Mask of games that are still running.
+        """
+        lane_count = self.scenario.lane_count
+        speed_coeff_modifier = self.scenario.spawn_speed_spread
+        x_offset_behind, x_offset_in_front = self.scenario.spawn_offsets
+
+        open_lanes = self.lane_slots < 0
+        open_count = open_lanes.sum(axis=1)
+        games = np.flatnonzero(alive & (self.npc_active.sum(axis=1) + 1 <= lane_count) & (open_count > 0))
+        if not games.size:
+            return
+
+        # The spawn draws are made even when the bucket turns out to be empty, like place_car
+        if self.spawn_keys is not None:
+            counters = self.spawn_counters[games]
+            draws = counter_uniform(self.spawn_keys[games, None], counters[:, None] + np.arange(3, dtype=np.uint64))
+            self.spawn_counters[games] = counters + 3
+            picks = (draws[:, 0] * open_count[games]).astype(np.int64)
+            behind = (draws[:, 1] * 2).astype(np.int64) == 0
+            coefficients = draws[:, 2] * speed_coeff_modifier
+        else:
+            picks, behind, coefficients = [], [], []
+            for g, count in zip(games.tolist(), open_count[games].tolist()):
+                rng = self.rngs[g].spawn
+                picks.append(rng.choice(range(count)))  # Draws like choice(open_lanes)
+                behind.append(rng.choice((True, False)))
+                coefficients.append(rng.random() * speed_coeff_modifier)
+            picks, behind, coefficients = np.array(picks), np.array(behind), np.array(coefficients)
+
+        has_car = self.bucket_size[games] > 0
+        games, picks, behind, coefficients = games[has_car], picks[has_car], behind[has_car], coefficients[has_car]
+        if not games.size:
+            return
+        lanes = np.argmax(np.cumsum(open_lanes[games], axis=1) > picks[:, None], axis=1)
+        self.bucket_size[games] -= 1
+        slots = self.bucket[games, self.bucket_size[games]]
+        self.lane_slots[games, lanes] = slots
+        self.npc_seq[games, slots] = self.placed[games]
+        self.placed[games] += 1
+
+        offsets = np.where(behind, x_offset_behind, x_offset_in_front)
+        ego_vx = self.ego_vx[games]
+        width = self.npc_w[games, slots]
+        height = self.npc_h[games, slots]
+        self.npc_vx[games, slots] = np.where(offsets == x_offset_behind, ego_vx + coefficients, ego_vx - coefficients)
+        self.npc_x[games, slots] = (self.scenario.screen_width * offsets) - (width // 2)
+        self.npc_y[games, slots] = np.trunc(self.lane_centers[lanes] - height / 2)
+        self.npc_lane[games, slots] = lanes
+        self.npc_active[games, slots] = True
+
+    def update_npcs(self, alive: np.ndarray) -> np.ndarray:
+        """
+        Move, jitter, retire and spawn cars in every running game: update_cars, remove_passed_cars and place_cars.
+
+        In "streams" mode this runs the fused kernel of src.game.kernels when numba is
+        installed (see use_kernel), with the same results as the NumPy code. In "compat"
+        mode, or without numba, it runs the three NumPy steps one after another: "compat"
+        jitter and spawn draws come from each game's random.Random in car-list order,
+        which compiled code cannot reproduce. benchmarks/bench_npcs.py checks the kernel
+        against the NumPy code.
+
+        :param alive: Mask of games that are still running.
+        :return: Mask of NPC cars that drove the whole tick (neither retired nor newly placed).
+        """
+        if not self.use_kernel:
+            self.update_cars(alive)
+            self.remove_passed_cars(alive)
+            moved = self.npc_active.copy()
+            self.place_cars(alive)
+            return moved
+
+        self.ego_y[alive] += self.ego_vy[alive]
+        was_active = self.npc_active.copy()
+        passed = np.zeros_like(self.npc_active)
+        scenario = self.scenario
+        x_offset_behind, x_offset_in_front = scenario.spawn_offsets
+        npc_tick(
+            alive, self.ego_vx, self.npc_x, self.npc_y, self.npc_vx, self.npc_w, self.npc_h, self.npc_lane,
+            self.npc_active, self.npc_seq, self.placed, self.lane_slots, self.bucket, self.bucket_size,
+            self.jitter_keys, self.jitter_counters, self.spawn_keys, self.spawn_counters, self.lane_centers,
+            float(scenario.screen_width), float(x_offset_behind), float(x_offset_in_front), float(scenario.spawn_speed_spread),
+            float(-scenario.retire_distance), float(scenario.screen_width + scenario.retire_distance), passed,
+        )
+        return was_active & ~passed
+
+    def update_sensors(self, alive: np.ndarray):
+        """
+        Ray cast every sensor of every running game in one pass.
+
+        :param alive: Mask of games that are still running.
+        """
+        games = np.flatnonzero(alive)
+        if not games.size:
+            return
+
+        centers = np.stack([
+            np.trunc(self.ego_x[games]) + self.ego_w[games] // 2,
+            np.trunc(self.ego_y[games]) + self.ego_h[games] // 2,
+        ], axis=1)
+        # Place the beam ends in screen coordinates first, like Sensor.update
+        directions = (centers[:, None, :] + self.sensor_vectors[None]) - centers[:, None, :]
+
+        npc_boxes = np.stack([
+            np.trunc(self.npc_x[games]), np.trunc(self.npc_y[games]), self.npc_w[games], self.npc_h[games],
+        ], axis=2)
+        wall_boxes = np.broadcast_to(self.walls, (games.size,) + self.walls.shape)
+        boxes = np.concatenate([npc_boxes, wall_boxes], axis=1)
+        valid = np.concatenate([self.npc_active[games], np.ones((games.size, len(self.walls)), dtype=bool)], axis=1)
+
+        readings = cast_rays(centers, directions, boxes, valid)
+        readings[~self.sensor_enabled[games]] = np.nan
+        self.readings[games] = readings
+
+    def check_collisions(self, alive: np.ndarray, previous: Optional[tuple] = None):
+        """
+        Mark games whose ego car overlaps an NPC car or a wall as crashed.
+
+        Rectangles are truncated to integer pixels like pygame.Rect. With the positions from
+        before the tick, the movement during the tick is swept too, so cars that pass
+        through each other between two ticks also crash.
+
+        :param alive: Mask of games that are still running.
+        :param previous: Optional (ego y, NPC x) arrays from before the tick, and the mask of
+            NPC cars that drove the whole tick (neither retired nor newly placed).
+        """
+        ex = np.trunc(self.ego_x)
+        ey = np.trunc(self.ego_y)
+        nx = np.trunc(self.npc_x)
+        ny = np.trunc(self.npc_y)
+        hit_car = (
+            (ex[:, None] < nx + self.npc_w) & (ex[:, None] + self.ego_w[:, None] > nx) &
+            (ey[:, None] < ny + self.npc_h) & (ey[:, None] + self.ego_h[:, None] > ny) &
+            self.npc_active
+        ).any(axis=1)
+
+        wx, wy, ww, wh = self.walls.T
+        hit_wall = (
+            (ex[:, None] < wx + ww) & (ex[:, None] + self.ego_w[:, None] > wx) &
+            (ey[:, None] < wy + wh) & (ey[:, None] + self.ego_h[:, None] > wy)
+        ).any(axis=1)
+
+        crashed = hit_car | hit_wall
+        if previous is not None:
+            previous_ey, previous_nx, moved = previous
+            previous_ey = np.trunc(previous_ey)
+            previous_nx = np.trunc(previous_nx)
+            ego = np.stack([ex, previous_ey, self.ego_w, self.ego_h], axis=1)
+            ego_motion = np.stack([np.zeros_like(ey), ey - previous_ey], axis=1)
+            cars = np.stack([previous_nx, ny, self.npc_w, self.npc_h], axis=2)
+            car_motion = np.stack([nx - previous_nx, np.zeros_like(ny)], axis=2)
+            boxes = np.concatenate([cars, np.broadcast_to(self.walls, (self.size,) + self.walls.shape)], axis=1)
+            motion = np.concatenate([car_motion, np.zeros((self.size, len(self.walls), 2))], axis=1)
+            valid = np.concatenate([moved, np.ones((self.size, len(self.walls)), dtype=bool)], axis=1)
+            crashed |= np.isfinite(swept_aabb(ego, ego_motion, boxes, motion, valid)).any(axis=1)
+
+        self.crashed |= alive & crashed
+
+    def step(self, actions, frame_skip: int = 1) -> np.ndarray:
+        """
+        Play frame_skip ticks in every running game, repeating each game's action.
+
+        Every tick is simulated in full, so trajectories do not depend on frame_skip. Sensors
+        are only cast after the last tick (or the tick a game ended), which makes large
+        frame_skip values much cheaper.
+
+        :param actions: One action per game, as action codes or action names.
+        :param frame_skip: The number of ticks to play.
+        :return: The done mask after the ticks.
+        """
+        actions = np.asarray(actions)
+        if actions.dtype.kind in "US":
+            actions = encode_actions(actions)
+
+        for tick in range(frame_skip):
+            alive = ~self.done
+            if not alive.any():
+                break
+            last = tick == frame_skip - 1
+
+            self.ticks[alive] += 1
+            self.handle_actions(actions, alive)
+            self.distance[alive] += self.ego_vx[alive]
+            previous = (self.ego_y.copy(), self.npc_x.copy()) if self.continuous_collisions else None
+            moved = self.update_npcs(alive)
+            if previous is not None:
+                # Cars placed this tick did not drive from their old slot position
+                previous += (moved,)
+            if last:
+                self.update_sensors(alive)
+            self.check_collisions(alive, previous)
+            if not last:
+                self.update_sensors(alive & self.done)
+        return self.done
@@ -1,21 +1,50 @@
 import pygame
+import random
+import numpy as np
 from time import sleep
+from typing import TYPE_CHECKING
 #import requests
 #from typing import List, Optional
-from ..mathematics.randomizer import seed, random_choice, random_number
+from ..mathematics import randomizer
+from ..mathematics.randomizer import seed, RandomStreams
 from ..elements.car import Car
-from ..elements.road import Road
-from ..elements.sensor import Sensor
+from ..elements.sensor import Sensor, update_sensors
 from ..mathematics.vector import Vector
-import json
+from .snapshot import Snapshot, take_snapshot, restore_snapshot
+from . import profiling
+from .render import Renderer
+
+if TYPE_CHECKING:
+    from .scenario import Scenario  # scenario imports the constants of this module
 
 # Define constants
 SCREEN_WIDTH = 1600
 SCREEN_HEIGHT = 1200
 LANE_COUNT = 5
 CAR_COLORS = ['yellow', 'blue', 'red']
+ACTIONS = ['NOTHING', 'ACCELERATE', 'DECELERATE', 'STEER_LEFT', 'STEER_RIGHT']  # Index = action code
 MAX_TICKS = 60 * 60  # 60 seconds @ 60 fps
 MAX_MS = 60 * 1000600   # 60 seconds flat
+MS_PER_TICK = 1000 / 60  # Fixed game time per tick in headless simulations
+SENSOR_OPTIONS = [  # (angle, name) of every sensor on the ego car
+    (90, "front"),
+    (135, "right_front"),
+    (180, "right_side"),
+    (225, "right_back"),
+    (270, "back"),
+    (315, "left_back"),
+    (0, "left_side"),
+    (45, "left_front"),
+    (22.5, "left_side_front"),
+    (67.5, "front_left_front"),
+    (112.5, "front_right_front"),
+    (157.5, "right_side_front"),
+    (202.5, "right_side_back"),
+    (247.5, "back_right_back"),
+    (292.5, "back_left_back"),
+    (337.5, "left_side_back"),
+]
+SENSOR_INDEX = {name: i for i, (_, name) in enumerate(SENSOR_OPTIONS)}  # Stable position of every sensor in readings arrays
 
 # Define game state
 class GameState:
@@ -34,6 +63,265 @@ class GameState:
         self.latest_action = "NOTHING"
         self.ticks = 0
 
+
+class RaceSimulation(GameState):
+    def __init__(self, seed_value=None, sensor_removal: int = 0, api_url: str = "", rng: random.Random = None, scenario: "Scenario" = None, rng_mode: str = "compat"):
+        """
+        Initialize a self-contained race-car game.
+
+        The simulation owns its road, cars, sensors and random generator, so any number of
+        them can live side by side in one process. Stepping never touches the pygame
+        display or clock.
+
+        :param seed_value: The seed for the simulation's random generator.
+        :param sensor_removal: The number of random sensors to remove from the ego car.
+        :param api_url: The URL of the prediction API (kept for parity with GameState).
+        :param rng: An already seeded random generator to use instead of seeding a new one (compat mode).
+        :param scenario: The road, traffic and sensor layout (defaults to the standard game).
+        :param rng_mode: "compat" draws everything from one random.Random like the original game,
+            "streams" gives sensor removal, car colors, spawning and every car's jitter their own
+            counter-based stream (see RandomStreams).
+        """
+        from .scenario import default_scenario
+
+        super().__init__(api_url)
+        self.rng = RandomStreams(seed_value, rng_mode, rng)
+        self.scenario = scenario = scenario or default_scenario()
+
+        # Create environment
+        self.road = scenario.build_road()
+        middle_lane = self.road.middle_lane()
+
+        # Create ego car
+        ego_velocity = Vector(scenario.ego_speed, 0)
+        self.ego = Car("yellow", ego_velocity, lane=middle_lane, target_height=scenario.car_height)
+        self.ego.x = (scenario.screen_width // 2) - (self.ego.width // 2)
+        self.ego.y = int((middle_lane.y_start + middle_lane.y_end) / 2 - self.ego.height / 2)
+        sensor_options = list(scenario.sensors)
+
+        for _ in range(sensor_removal): # Removes random sensors
+            random_sensor = self.rng.sensors.choice(sensor_options)
+            sensor_options.remove(random_sensor)
+        self.sensors = [
+            Sensor(self.ego, angle, name, self, scenario.sensor_range, scenario.beam_vectors[name])
+            for angle, name in sensor_options
+        ]
+        self.sensor_slots = np.array([SENSOR_INDEX[sensor.name] for sensor in self.sensors], dtype=np.intp)
+
+        # Create other cars and add to car bucket
+        self.jitter = {}  # The velocity jitter stream of every other car
+        for i in range(0, scenario.npc_count):
+            color = self.rng.colors.choice(scenario.npc_colors)
+            car = Car(color, Vector(scenario.npc_speed, 0), target_height=scenario.car_height)
+            self.car_bucket.append(car)
+            self.jitter[car] = self.rng.jitter(i)
+
+        self.cars = [self.ego]
+        self.lane_numbers = {lane: number for number, lane in enumerate(self.road.lanes)}
+        self.lane_occupants = [None] * len(self.road.lanes)  # The other car driving in every lane, None if open
+
+    @property
+    def done(self) -> bool:
+        """Return True once the ego car has crashed or the tick budget is used up."""
+        return self.crashed or self.ticks >= self.scenario.max_ticks
+
+    def handle_action(self, action: str):
+        if action == "ACCELERATE":
+            self.ego.speed_up()
+        elif action == "DECELERATE":
+            self.ego.slow_down()
+        elif action == "STEER_LEFT":
+            self.ego.turn(-0.1)
+        elif action == "STEER_RIGHT":
+            self.ego.turn(0.1)
+        else:
+            pass
+
+    def update_cars(self):
+        for car in self.cars:
+            car.update(self.ego, self.jitter.get(car))
+
+    def remove_passed_cars(self):
+        min_distance = -self.scenario.retire_distance
+        max_distance = self.scenario.screen_width + self.scenario.retire_distance
+        cars_to_keep = []
+        cars_to_retire = []
+
+        for car in self.cars:
+            if car.x < min_distance or car.x > max_distance:
+                cars_to_retire.append(car)
+            else:
+                cars_to_keep.append(car)
+
+        for car in cars_to_retire:
+            self.car_bucket.append(car)
+            if car.lane is not None and self.lane_occupants[self.lane_numbers[car.lane]] is car:
+                self.lane_occupants[self.lane_numbers[car.lane]] = None
+            car.lane = None
+
+        self.cars = cars_to_keep
+
+    def lane_is_open(self, lane) -> bool:
+        """Return True if no other car drives in the lane."""
+        return self.lane_occupants[self.lane_numbers[lane]] is None
+
+    def index_lanes(self):
+        """Rebuild the lane occupancy index from self.cars, after the cars were changed directly."""
+        self.lane_occupants = [None] * len(self.road.lanes)
+        for car in self.cars:
+            if car is not self.ego and car.lane is not None:
+                self.lane_occupants[self.lane_numbers[car.lane]] = car
+
+    def place_car(self):
+        scenario = self.scenario
+        if len(self.cars) > scenario.lane_count:
+            return
+
+        speed_coeff_modifier = scenario.spawn_speed_spread
+        x_offset_behind, x_offset_in_front = scenario.spawn_offsets
+
+        open_lanes = [lane for lane, occupant in zip(self.road.lanes, self.lane_occupants) if occupant is None]
+        if not open_lanes:
+            return
+        spawn = self.rng.spawn
+        lane = spawn.choice(open_lanes)
+        x_offset = spawn.choice([x_offset_behind, x_offset_in_front])
+        horizontal_velocity_coefficient = spawn.random() * speed_coeff_modifier
+
+        car = self.car_bucket.pop() if self.car_bucket else None
+        if not car:
+            return
+
+        velocity_x = self.ego.velocity.x + horizontal_velocity_coefficient if x_offset == x_offset_behind else self.ego.velocity.x - horizontal_velocity_coefficient
+        car.velocity = Vector(velocity_x, 0)
+        self.cars.append(car)
+
+        car.x = (scenario.screen_width * x_offset) - (car.width // 2)
+        car.y = int((lane.y_start + lane.y_end) / 2 - car.height / 2)
+        car.lane = lane
+        self.lane_occupants[self.lane_numbers[lane]] = car
+        if profiling.PROFILER is not None:
+            profiling.PROFILER.count(profiling.PLACEMENTS)
+
+    def update_sensors(self):
+        """
+        Update every sensor reading in one batched ray cast.
+
+        :return: The readings in SENSOR_OPTIONS order like BatchRaceSimulation.readings, NaN
+            where a sensor sees nothing or was removed.
+        """
+        readings = np.full(len(SENSOR_OPTIONS), np.nan)
+        readings[self.sensor_slots] = update_sensors(self.sensors, self)
+        return readings
+
+    def check_collisions(self) -> bool:
+        """
+        Mark the simulation as crashed if the ego car touches another car or a wall.
+
+        :return: True if the ego car has crashed.
+        """
+        profiler = profiling.PROFILER
+        if profiler is not None:
+            profiler.mark()
+        ego_rect = self.ego.rect
+        # Other cars never leave their lane, so only the lanes the ego car overlaps can hold a crash
+        first = max(int((ego_rect.top - self.road.y_start) // self.road.lane_height), 0)
+        last = int((ego_rect.bottom - self.road.y_start) // self.road.lane_height)
+        tests = 0
+        for car in self.lane_occupants[first:last + 1]:
+            if car is not None:
+                tests += 1
+                if intersects(ego_rect, car.rect):
+                    self.crashed = True
+
+        for wall in self.road.walls:
+            if intersects(ego_rect, wall.rect):
+                self.crashed = True
+
+        if profiler is not None:
+            profiler.count(profiling.INTERSECTION_TESTS, tests + len(self.road.walls))
+            profiler.lap(profiling.COLLISIONS)
+        return self.crashed
+
+    def to_request(self) -> dict:
+        """
+        Describe the game the way the evaluation server sends it to /predict.
+
+        :return: A dict with the fields of RaceCarPredictRequestDto.
+        """
+        return {
+            "did_crash": self.crashed,
+            "elapsed_time_ms": int(self.elapsed_game_time),
+            "distance": self.distance,
+            "velocity": {"x": self.ego.velocity.x, "y": self.ego.velocity.y},
+            "coordinates": {"x": self.ego.x, "y": self.ego.y},
+            "sensors": {sensor.name: sensor.reading for sensor in self.sensors},
+        }
+
+    def snapshot(self) -> Snapshot:
+        """
+        Capture the game, including its random generator, for tree search or rollbacks.
+
+        :return: A snapshot that restore() accepts.
+        """
+        return take_snapshot(self, self.rng)
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Put the game back to a snapshot taken from this simulation.
+
+        :param snapshot: The snapshot to restore.
+        """
+        restore_snapshot(self, self.rng, snapshot)
+        self.index_lanes()
+
+    def update(self, action: str):
+        """
+        Advance the world by one tick without collision checks (the body of update_game).
+
+        :param action: The action to apply to the ego car.
+        """
+        profiler = profiling.PROFILER
+        if profiler is not None:
+            self._update_profiled(action, profiler)
+            return
+        self.handle_action(action)
+        self.distance += self.ego.velocity.x
+        self.update_cars()
+        self.remove_passed_cars()
+        self.place_car()
+        self.update_sensors()
+
+    def _update_profiled(self, action: str, profiler):
+        profiler.begin(self.ticks)
+        self.handle_action(action)
+        self.distance += self.ego.velocity.x
+        profiler.lap(profiling.HANDLE_ACTION)
+        self.update_cars()
+        profiler.lap(profiling.UPDATE_CARS)
+        self.remove_passed_cars()
+        profiler.lap(profiling.REMOVE_PASSED_CARS)
+        self.place_car()
+        profiler.lap(profiling.PLACE_CAR)
+        self.update_sensors()
+        profiler.lap(profiling.SENSORS)
+
+    def step(self, action: str) -> bool:
+        """
+        Play one full tick: apply the action, advance the world and check for collisions.
+
+        Game time advances by a fixed 1/60 s per tick, independent of the host speed.
+
+        :param action: The action to apply to the ego car.
+        :return: True if the ego car has crashed.
+        """
+        self.ticks += 1
+        self.elapsed_game_time += MS_PER_TICK
+        self.latest_action = action
+        self.update(action)
+        return self.check_collisions()
+
+
 STATE = None
 
 
@@ -42,65 +330,17 @@ def intersects(rect1, rect2):
 
 # Game logic
 def handle_action(action: str):
-    if action == "ACCELERATE":
-        STATE.ego.speed_up()
-    elif action == "DECELERATE":
-        STATE.ego.slow_down()
-    elif action == "STEER_LEFT":
-        STATE.ego.turn(-0.1)
-    elif action == "STEER_RIGHT":
-        STATE.ego.turn(0.1)
-    else:
-        pass
+    STATE.handle_action(action)
 
 def update_cars():
-    for car in STATE.cars:
-        car.update(STATE.ego)
+    STATE.update_cars()
 
 
 def remove_passed_cars():
-    min_distance = -1000
-    max_distance = SCREEN_WIDTH + 1000
-    cars_to_keep = []
-    cars_to_retire = []
-
-    for car in STATE.cars:
-        if car.x < min_distance or car.x > max_distance:
-            cars_to_retire.append(car)
-        else:
-            cars_to_keep.append(car)
-
-    for car in cars_to_retire:
-        STATE.car_bucket.append(car)
-        car.lane = None
-
-    STATE.cars = cars_to_keep
+    STATE.remove_passed_cars()
 
 def place_car():
-    if len(STATE.cars) > LANE_COUNT:
-        return
-
-    speed_coeff_modifier = 5
-    x_offset_behind = -0.5
-    x_offset_in_front = 1.5
-
-    open_lanes = [lane for lane in STATE.road.lanes if not any(c.lane == lane for c in STATE.cars if c != STATE.ego)]
-    lane = random_choice(open_lanes)
-    x_offset = random_choice([x_offset_behind, x_offset_in_front])
-    horizontal_velocity_coefficient = random_number() * speed_coeff_modifier
-
-    car = STATE.car_bucket.pop() if STATE.car_bucket else None
-    if not car:
-        return
-
-    velocity_x = STATE.ego.velocity.x + horizontal_velocity_coefficient if x_offset == x_offset_behind else STATE.ego.velocity.x - horizontal_velocity_coefficient
-    car.velocity = Vector(velocity_x, 0)
-    STATE.cars.append(car)
-
-    car_sprite = car.sprite
-    car.x = (SCREEN_WIDTH * x_offset) - (car_sprite.get_width() // 2)
-    car.y = int((lane.y_start + lane.y_end) / 2 - car_sprite.get_height() / 2)
-    car.lane = lane
+    STATE.place_car()
 
 
 def get_action():
@@ -152,164 +392,127 @@ def get_action():
     #return STATE.latest_action if hasattr(STATE, "latest_action") else "NOTHING"
     return "NOTHING"
 
-def get_action_json():
+def get_action_json(path: str = "actions_log.json"):
     """
     Get action depending on tick from the actions_log.json.
     Finds the action for the current STATE.ticks.
+
+    The log is read and indexed by tick once, later calls are a list lookup.
     """
-    try:
-        with open("actions_log.json", "r") as f:
-            actions = json.load(f)
-            for entry in actions:
-                if entry.get("tick") == STATE.ticks:
-                    return entry.get("action", "NOTHING")
-            return "NOTHING"
-    except FileNotFoundError:
+    from .replay import cached_action_log
+
+    log = cached_action_log(path)
+    if log is None:
         return "NOTHING"
+    return log.action(STATE.ticks)
 
 
-def initialize_game_state( api_url: str, seed_value: str, sensor_removal = 0):
+def initialize_game_state( api_url: str, seed_value: str, sensor_removal = 0, scenario = None):
     seed(seed_value)
     global STATE
-    STATE = GameState(api_url)
-
-    # Create environment
-    STATE.road = Road(SCREEN_WIDTH, SCREEN_HEIGHT, LANE_COUNT)
-    middle_lane = STATE.road.middle_lane()
-    lane_height = STATE.road.get_lane_height()
-
-    # Create ego car
-    ego_velocity = Vector(10, 0)
-    STATE.ego = Car("yellow", ego_velocity, lane=middle_lane, target_height=int(lane_height * 0.8))
-    ego_sprite = STATE.ego.sprite
-    STATE.ego.x = (SCREEN_WIDTH // 2) - (ego_sprite.get_width() // 2)
-    STATE.ego.y = int((middle_lane.y_start + middle_lane.y_end) / 2 - ego_sprite.get_height() / 2)
-    sensor_options = [
-            (90, "front"),
-            (135, "right_front"),
-            (180, "right_side"),
-            (225, "right_back"),
-            (270, "back"),
-            (315, "left_back"),
-            (0, "left_side"),
-            (45, "left_front"),
-            (22.5, "left_side_front"),
-            (67.5, "front_left_front"),
-            (112.5, "front_right_front"),
-            (157.5, "right_side_front"),
-            (202.5, "right_side_back"),
-            (247.5, "back_right_back"),
-            (292.5, "back_left_back"),
-            (337.5, "left_side_back"),
-        ]
-
-    for _ in range(sensor_removal): # Removes random sensors
-        random_sensor = random_choice(sensor_options)
-        sensor_options.remove(random_sensor)
-    STATE.sensors = [
-        Sensor(STATE.ego, angle, name, STATE)
-        for angle, name in sensor_options
-    ]
+    STATE = RaceSimulation(seed_value, sensor_removal, api_url=api_url, rng=randomizer.rng, scenario=scenario)
 
-    # Create other cars and add to car bucket
-    for i in range(0, LANE_COUNT - 1):
-        car_colors = ["blue", "red"]
-        color = random_choice(car_colors)
-        car = Car(color, Vector(8, 0), target_height=int(lane_height * 0.8))
-        STATE.car_bucket.append(car)
+def snapshot() -> Snapshot:
+    return STATE.snapshot()
 
-    STATE.cars = [STATE.ego]
+def restore(snapshot: Snapshot):
+    STATE.restore(snapshot)
 
 def update_game(current_action: str):
-    handle_action(current_action)
-    STATE.distance += STATE.ego.velocity.x
-    update_cars()
-    remove_passed_cars()
-    place_car()
-    for sensor in STATE.sensors:
-        sensor.update()
+    STATE.update(current_action)
 
     return STATE
     
 # Main game loop
 ACTION_LOG = []
 
-def game_loop(verbose: bool = True, log_actions: bool = True, log_path: str = "actions_log.json"):
+def game_loop(verbose: bool = True, log_actions: bool = True, log_path: str = "actions_log.json", fast_forward: bool = False, action_source=None, recorder=None, frame_exporter=None, profiler=None):
+    """
+    Run the game until the ego car crashes or the time is up.
+
+    :param verbose: Open a window and render every tick.
+    :param log_actions: Append every action to ACTION_LOG.
+    :param log_path: Where the action log would be saved.
+    :param fast_forward: Run as fast as the CPU allows with a fixed 1/60 s of game time per tick,
+        no per-tick output and no rendering, so results are identical on every machine.
+        Needs an action_source, since there is no window to read the keyboard from.
+    :param action_source: Function returning the action for the current tick (defaults to get_action,
+        the keyboard).
+    :param recorder: Optional TrajectoryRecorder that every tick is streamed to. It is not closed here, so
+        close it (or use it as a context manager) once all games are played.
+    :param frame_exporter: Optional FrameExporter that renders frames offscreen, also in fast-forward mode.
+    :param profiler: Optional TickProfiler that times every phase of every tick, saved at game end if it has a path.
+    :return: The final game state.
+    :raises ValueError: If fast_forward is set without an action_source.
+    """
+    if fast_forward and action_source is None:
+        raise ValueError("fast_forward needs an action_source: the keyboard of get_action is only read from a window")
+    if profiler is not None:
+        with profiler:
+            return _game_loop(verbose, log_actions, log_path, fast_forward, action_source, recorder, frame_exporter, profiler)
+    return _game_loop(verbose, log_actions, log_path, fast_forward, action_source, recorder, frame_exporter, None)
+
+
+def _game_loop(verbose, log_actions, log_path, fast_forward, action_source, recorder, frame_exporter, profiler):
     global STATE
-    clock = pygame.time.Clock()
+    if action_source is None:
+        action_source = get_action
+    if fast_forward:
+        verbose = False
+    clock = None if fast_forward else pygame.time.Clock()
     screen = None
     if verbose:
-        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        screen = pygame.display.set_mode((STATE.scenario.screen_width, STATE.scenario.screen_height))
         pygame.display.set_caption("Race Car Game")
+        renderer = Renderer(STATE.road)
 
     while True:
-        delta = clock.tick(60)  # Limit to 60 FPS
-        STATE.elapsed_game_time += delta
+        if fast_forward:
+            STATE.elapsed_game_time += MS_PER_TICK
+        else:
+            delta = clock.tick(60)  # Limit to 60 FPS
+            STATE.elapsed_game_time += delta
         STATE.ticks += 1
 
 
-        if STATE.crashed or STATE.ticks > MAX_TICKS or STATE.elapsed_game_time > MAX_MS:
+        if STATE.crashed or STATE.ticks > STATE.scenario.max_ticks or STATE.elapsed_game_time > MAX_MS:
             print(f"Game over: Crashed: {STATE.crashed}, Ticks: {STATE.ticks}, Elapsed time: {STATE.elapsed_game_time} ms, Distance: {STATE.distance}")
             break
 
+        if profiler is not None:
+            profiler.begin(STATE.ticks)
+
         # Handle action - get_action() is a method for using arrow keys to steer - implement own logic here!
-        action = get_action()
+        action = action_source()
+
+        if profiler is not None:
+            profiler.lap(profiling.POLICY)
 
         # Log the action with tick
         if log_actions:
             ACTION_LOG.append({"tick": STATE.ticks, "action": action})
 
-        handle_action(action)
-
-        STATE.distance += STATE.ego.velocity.x
-        update_cars()
-        remove_passed_cars()
-        place_car()
-
-        print("Current action:", action)
-        print("Currnet tick:", STATE.ticks)
-
-        # Update sensors
-        for sensor in STATE.sensors:
-            sensor.update()
-        
-        # Handle collisions
-        for car in STATE.cars:
-            if car != STATE.ego and intersects(STATE.ego.rect, car.rect):
-                STATE.crashed = True
-        
-        # Check collision with walls
-        for wall in STATE.road.walls:
-            if intersects(STATE.ego.rect, wall.rect):
-                STATE.crashed = True
-
-        # Render game (only if verbose)
-        if verbose:
-            screen.fill((0, 0, 0))  # Clear the screen with black
+        STATE.update(action)
 
-            # Draw the road background
-            screen.blit(STATE.road.surface, (0, 0))
+        if not fast_forward:
+            print("Current action:", action)
+            print("Currnet tick:", STATE.ticks)
 
-            # Draw all walls
-            for wall in STATE.road.walls:
-                wall.draw(screen)
+        # Handle collisions with cars and walls
+        STATE.check_collisions()
 
-            # Draw all cars
-            for car in STATE.cars:
-                if car.sprite:
-                    screen.blit(car.sprite, (car.x, car.y))
-                    bounds = car.get_bounds()
-                    color = (255, 0, 0) if car == STATE.ego else (0, 255, 0)
-                    pygame.draw.rect(screen, color, bounds, width=2)
-                else:
-                    pygame.draw.rect(screen, (255, 255, 0) if car == STATE.ego else (0, 0, 255), car.rect)
+        if recorder is not None:
+            recorder.record(STATE, action)
 
-            # Draw sensors if enabled
-            if STATE.sensors_enabled:
-                for sensor in STATE.sensors:
-                    sensor.draw(screen)
+        if frame_exporter is not None:
+            frame_exporter.capture(STATE)
 
-            pygame.display.flip()
+        # Render game (only if verbose), redrawing only what changed since the last frame
+        if verbose:
+            pygame.display.update(renderer.draw(screen, STATE))
+
+        if profiler is not None:
+            profiler.lap(profiling.OUTPUT)
 
     # # Save actions to file after game ends
     # import os
@@ -320,6 +523,10 @@ def game_loop(verbose: bool = True, log_actions: bool = True, log_path: str = "a
     #     with open(log_path, "w") as f:
     #         json.dump(ACTION_LOG, f, indent=2)
 
+    if recorder is not None:
+        recorder.end_episode()
+    return STATE
+
 # Initialization - not used
 def init(api_url: str):
     global STATE
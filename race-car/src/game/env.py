@@ -0,0 +1,249 @@
+import multiprocessing as mp
+import numpy as np
+from multiprocessing import shared_memory
+from typing import List, Optional
+from .core import RaceSimulation, ACTIONS
+from .features import ENCODER
+
+try:
+    import gymnasium as gym
+    from gymnasium import spaces
+except ImportError:  # gymnasium is optional, the environments work without it
+    gym = None
+    spaces = None
+
+OBSERVATION_SIZE = ENCODER.size  # Sensor readings followed by ego velocity x, y
+
+
+def observe(sim: RaceSimulation, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Build the observation vector of a simulation.
+
+    The readings are laid out in SENSOR_OPTIONS order, so the vector has the same shape
+    even when sensors were removed. See FeatureEncoder.
+
+    :param sim: The simulation to observe.
+    :param out: Optional float32 array of length OBSERVATION_SIZE to write into.
+    :return: The observation as a float32 array.
+    """
+    return ENCODER.encode_state(sim, out)
+
+
+class RaceCarEnv(gym.Env if gym is not None else object):
+    metadata = {"render_modes": []}
+
+    def __init__(self, sensor_removal: int = 0, scenario=None):
+        """
+        Initialize a Gymnasium-style environment around a headless RaceSimulation.
+
+        Actions are indices into ACTIONS (action names are accepted too). The reward is the
+        distance driven during the tick, an episode terminates when the ego car crashes and
+        is truncated when the scenario's tick budget is used up.
+
+        :param sensor_removal: The number of random sensors removed from the ego car.
+        :param scenario: The Scenario to play (defaults to the standard game).
+        """
+        self.sensor_removal = sensor_removal
+        self.scenario = scenario
+        self.sim = None
+        if spaces is not None:
+            self.action_space = spaces.Discrete(len(ACTIONS))
+            self.observation_space = spaces.Box(-np.inf, np.inf, shape=(OBSERVATION_SIZE,), dtype=np.float32)
+
+    def reset(self, seed=None, options=None):
+        """
+        Start a new game.
+
+        :param seed: The seed of the new game.
+        :param options: Unused, kept for the Gymnasium signature.
+        :return: The first observation and an info dict.
+        """
+        self.sim = RaceSimulation(seed, self.sensor_removal, scenario=self.scenario)
+        return observe(self.sim), self._info()
+
+    def step(self, action):
+        """
+        Play one tick.
+
+        :param action: An action index or action name.
+        :return: (observation, reward, terminated, truncated, info)
+        """
+        if not isinstance(action, str):
+            action = ACTIONS[int(action)]
+        distance = self.sim.distance
+        crashed = self.sim.step(action)
+        reward = self.sim.distance - distance
+        truncated = not crashed and self.sim.done
+        return observe(self.sim), float(reward), crashed, truncated, self._info()
+
+    def _info(self) -> dict:
+        return {"distance": self.sim.distance, "ticks": self.sim.ticks}
+
+
+class RaceCarVectorEnv:
+    def __init__(self, num_envs: int, num_workers: Optional[int] = None, sensor_removal: int = 0, scenario=None):
+        """
+        Initialize many RaceCarEnv games spread over worker processes.
+
+        Workers write observations, rewards and done flags straight into shared memory, so a
+        step only sends the actions and a short acknowledgement through the pipes. Finished
+        games are reset automatically; their last observation is returned in
+        info["final_observation"].
+
+        :param num_envs: The number of games.
+        :param num_workers: The number of worker processes (defaults to the CPU count).
+        :param sensor_removal: The number of random sensors removed from each ego car.
+        :param scenario: The Scenario every game plays (defaults to the standard game).
+        """
+        self.num_envs = num_envs
+        num_workers = min(num_envs, num_workers or mp.cpu_count())
+
+        self._buffers = {
+            "observations": ((num_envs, OBSERVATION_SIZE), np.float32),
+            "rewards": ((num_envs,), np.float64),
+            "terminated": ((num_envs,), np.bool_),
+            "truncated": ((num_envs,), np.bool_),
+        }
+        self._memory = {}
+        self._arrays = {}
+        for name, (shape, dtype) in self._buffers.items():
+            memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            self._memory[name] = memory
+            self._arrays[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+        self._slices = np.array_split(np.arange(num_envs), num_workers)
+        self._pipes = []
+        self._workers = []
+        for indices in self._slices:
+            parent, child = mp.Pipe()
+            worker = mp.Process(
+                target=_worker,
+                args=(child, indices[0], len(indices), sensor_removal, scenario, {name: m.name for name, m in self._memory.items()}, self._buffers),
+                daemon=True,
+            )
+            worker.start()
+            child.close()
+            self._pipes.append(parent)
+            self._workers.append(worker)
+
+        if spaces is not None:
+            self.single_action_space = spaces.Discrete(len(ACTIONS))
+            self.single_observation_space = spaces.Box(-np.inf, np.inf, shape=(OBSERVATION_SIZE,), dtype=np.float32)
+
+    def reset(self, seed=None, options=None):
+        """
+        Start a new game in every slot.
+
+        :param seed: An int (games get seed, seed + 1, ...), a sequence of seeds or None.
+        :param options: Unused, kept for the Gymnasium signature.
+        :return: The observations and a list of info dicts.
+        """
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+        for pipe, indices in zip(self._pipes, self._slices):
+            pipe.send(("reset", [seeds[i] for i in indices]))
+        infos = self._collect()
+        return self._arrays["observations"].copy(), infos
+
+    def step(self, actions):
+        """
+        Play one tick in every game.
+
+        :param actions: One action index or action name per game.
+        :return: (observations, rewards, terminated, truncated, infos)
+        """
+        for pipe, indices in zip(self._pipes, self._slices):
+            pipe.send(("step", [actions[i] for i in indices]))
+        infos = self._collect()
+        return (
+            self._arrays["observations"].copy(),
+            self._arrays["rewards"].copy(),
+            self._arrays["terminated"].copy(),
+            self._arrays["truncated"].copy(),
+            infos,
+        )
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        for pipe in self._pipes:
+            try:
+                pipe.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.join(timeout=1)
+        self._arrays.clear()
+        for memory in self._memory.values():
+            memory.close()
+            memory.unlink()
+        self._memory.clear()
+
+    def _collect(self) -> List[dict]:
+        infos = []
+        for pipe in self._pipes:
+            infos.extend(pipe.recv())
+        return infos
+
+    def __del__(self):
+        if getattr(self, "_memory", None):
+            self.close()
+
+
+def _worker(pipe, start: int, count: int, sensor_removal: int, scenario, memory_names: dict, buffers: dict):
+    """
+    Run a slice of the vector environment's games until told to close.
+    """
+    memory = {name: shared_memory.SharedMemory(name=memory_name) for name, memory_name in memory_names.items()}
+    arrays = {
+        name: np.ndarray(shape, dtype=dtype, buffer=memory[name].buf)[start:start + count]
+        for name, (shape, dtype) in buffers.items()
+    }
+    envs = [RaceCarEnv(sensor_removal, scenario) for _ in range(count)]
+    episodes = [0] * count
+    seeds = [None] * count
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "close":
+                break
+
+            infos = []
+            if command == "reset":
+                for i, (env, seed_value) in enumerate(zip(envs, data)):
+                    seeds[i] = seed_value
+                    episodes[i] = 0
+                    observation, info = env.reset(seed_value)
+                    arrays["observations"][i] = observation
+                    infos.append(info)
+                arrays["rewards"][:] = 0
+                arrays["terminated"][:] = False
+                arrays["truncated"][:] = False
+
+            elif command == "step":
+                for i, (env, action) in enumerate(zip(envs, data)):
+                    observation, reward, terminated, truncated, info = env.step(action)
+                    if terminated or truncated:
+                        info["final_observation"] = observation
+                        episodes[i] += 1
+                        seed_value = None if seeds[i] is None else _next_seed(seeds[i], episodes[i])
+                        observation, _ = env.reset(seed_value)
+                    arrays["observations"][i] = observation
+                    arrays["rewards"][i] = reward
+                    arrays["terminated"][i] = terminated
+                    arrays["truncated"][i] = truncated
+                    infos.append(info)
+
+            pipe.send(infos)
+    finally:
+        arrays.clear()
+        for m in memory.values():
+            m.close()
+
+
+def _next_seed(seed_value, episode: int):
+    """Derive the seed of a game's next episode after an automatic reset."""
+    return f"{seed_value}/{episode}"
+
@@ -0,0 +1,109 @@
+import multiprocessing as mp
+import statistics
+from collections import deque
+from functools import partial
+from typing import Callable, List, Optional, Sequence, Union
+from .core import RaceSimulation
+
+Policy = Callable[[dict], Union[str, List[str]]]
+
+
+def play(policy: Policy, seed_value, sensor_removal: int = 0, scenario=None, frame_exporter=None) -> dict:
+    """
+    Play one game with a policy as fast as the CPU allows.
+
+    The policy gets the same request dict as the /predict endpoint and returns one action
+    or a list of actions. Actions are consumed like on the evaluation server: one per
+    tick, repeating the last one while the policy is asked for more.
+
+    :param policy: A callable mapping a request dict to an action or list of actions.
+    :param seed_value: The seed of the game.
+    :param sensor_removal: The number of random sensors removed from the ego car.
+    :param scenario: The Scenario to play (defaults to the standard game).
+    :param frame_exporter: Optional callable building a FrameExporter for the game's road, to record it.
+    :return: The outcome of the game.
+    """
+    sim = RaceSimulation(seed_value, sensor_removal, scenario=scenario)
+    queue = deque()
+    action = "NOTHING"
+    policy_calls = 0
+    exporter = frame_exporter(sim.road) if frame_exporter is not None else None
+
+    while not sim.done:
+        if not queue:
+            actions = policy(sim.to_request())
+            policy_calls += 1
+            queue.extend([actions] if isinstance(actions, str) else actions)
+        if queue:
+            action = queue.popleft()
+        sim.step(action)
+        if exporter is not None:
+            exporter.capture(sim)
+
+    if exporter is not None:
+        exporter.close()
+    return {
+        "seed": seed_value,
+        "distance": sim.distance,
+        "crashed": sim.crashed,
+        "ticks": sim.ticks,
+        "policy_calls": policy_calls,
+    }
+
+
+def evaluate(policy: Policy, seeds: Sequence, processes: Optional[int] = None, sensor_removal: int = 0, scenario=None) -> List[dict]:
+    """
+    Play one game per seed, spread over a process pool.
+
+    The policy must be picklable (for example a module-level function).
+
+    :param policy: A callable mapping a request dict to an action or list of actions.
+    :param seeds: The seeds to play.
+    :param processes: The number of worker processes (defaults to the CPU count, 1 runs in-process).
+    :param sensor_removal: The number of random sensors removed from each ego car.
+    :param scenario: The Scenario every game plays (defaults to the standard game).
+    :return: The outcome of every game, in the order of seeds.
+    """
+    run = partial(play, policy, sensor_removal=sensor_removal, scenario=scenario)
+    if processes == 1:
+        return [run(seed_value) for seed_value in seeds]
+
+    processes = processes or mp.cpu_count()
+    with mp.Pool(processes) as pool:
+        return pool.map(run, seeds, chunksize=max(1, len(seeds) // (4 * processes)))
+
+
+def summarize(results: List[dict]) -> dict:
+    """
+    Aggregate the distance and crash statistics of a list of game outcomes.
+
+    :param results: Outcomes as returned by play/evaluate.
+    :return: The summary statistics.
+    """
+    distances = [r["distance"] for r in results]
+    crashes = [r for r in results if r["crashed"]]
+    return {
+        "games": len(results),
+        "crash_rate": len(crashes) / len(results),
+        "distance_mean": statistics.fmean(distances),
+        "distance_std": statistics.pstdev(distances),
+        "distance_min": min(distances),
+        "distance_median": statistics.median(distances),
+        "distance_max": max(distances),
+        "ticks_mean": statistics.fmean(r["ticks"] for r in results),
+        "crash_tick_mean": statistics.fmean(r["ticks"] for r in crashes) if crashes else None,
+    }
+
+
+def format_table(summary: dict) -> str:
+    """Format a summary from summarize() as a two-column text table."""
+    rows = []
+    for name, value in summary.items():
+        if value is None:
+            text = "-"
+        elif isinstance(value, float):
+            text = f"{value:.3f}" if name == "crash_rate" else f"{value:.1f}"
+        else:
+            text = str(value)
+        rows.append(f"{name:<18}{text:>14}")
+    return "\n".join(rows)
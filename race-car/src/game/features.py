@@ -0,0 +1,146 @@
+import numpy as np
+from typing import List, Optional, Sequence
+from .core import SENSOR_OPTIONS, SENSOR_INDEX
+
+SENSOR_REACH = 1000  # Reported for sensors that see nothing or were removed
+_NUMBER = (int, float)
+
+
+def check_request(request) -> dict:
+    """
+    Check the types and shape of a /predict request without building a model of it.
+
+    Only the fields the simulator and the encoder read are checked: numbers where numbers
+    are expected, x and y in velocity and coordinates, and known sensor names with a
+    number or None as reading.
+
+    :param request: The parsed JSON body.
+    :return: The request, unchanged.
+    :raises ValueError: Describing the first problem found.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("The request must be a JSON object")
+    if not isinstance(request.get("did_crash"), bool):
+        raise ValueError("did_crash must be a boolean")
+    for field in ("elapsed_time_ms", "distance"):
+        if not _is_number(request.get(field)):
+            raise ValueError(f"{field} must be a number")
+    for field in ("velocity", "coordinates"):
+        value = request.get(field)
+        if not isinstance(value, dict) or not _is_number(value.get("x")) or not _is_number(value.get("y")):
+            raise ValueError(f"{field} must be an object with numbers x and y")
+    sensors = request.get("sensors")
+    if not isinstance(sensors, dict):
+        raise ValueError("sensors must be an object mapping sensor names to readings")
+    for name, reading in sensors.items():
+        if name not in SENSOR_INDEX:
+            raise ValueError(f"Unknown sensor {name!r}")
+        if reading is not None and not _is_number(reading):
+            raise ValueError(f"The reading of sensor {name!r} must be a number or null")
+    return request
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, _NUMBER) and not isinstance(value, bool)
+
+
+class FeatureEncoder:
+    def __init__(self, coordinates: bool = False, missing: float = SENSOR_REACH):
+        """
+        Initialize an encoder that turns a game state into a fixed-order float32 feature vector.
+
+        The layout is the 16 sensor readings in SENSOR_OPTIONS order (the table behind the
+        sensors of initialize_game_state), then the ego velocity x, y and optionally the ego
+        coordinates x, y. Requests (/predict dicts) and simulations encode to the same vector,
+        so a model trained on simulated games sees exactly the features it is served.
+
+        :param coordinates: Append the ego coordinates.
+        :param missing: The value of sensors that see nothing or were removed.
+        """
+        self.coordinates = coordinates
+        self.missing = missing
+        self.names: List[str] = [name for _, name in SENSOR_OPTIONS] + ["velocity_x", "velocity_y"]
+        if coordinates:
+            self.names += ["coordinates_x", "coordinates_y"]
+        self.size = len(self.names)
+        self._index = SENSOR_INDEX
+        self._velocity = len(SENSOR_OPTIONS)
+        self._template = [float(missing)] * len(SENSOR_OPTIONS) + [0.0] * (self.size - len(SENSOR_OPTIONS))
+
+    def values(self, request: dict) -> List[float]:
+        """
+        Encode a request dict as a plain list, in one pass over its sensors.
+
+        :param request: The request dict, as sent to /predict.
+        :raises KeyError: If a field or a sensor name is unknown.
+        """
+        values = self._template.copy()
+        index = self._index
+        for name, reading in request["sensors"].items():
+            if reading is not None:
+                values[index[name]] = reading
+        velocity = request["velocity"]
+        i = self._velocity
+        values[i] = velocity["x"]
+        values[i + 1] = velocity["y"]
+        if self.coordinates:
+            coordinates = request["coordinates"]
+            values[i + 2] = coordinates["x"]
+            values[i + 3] = coordinates["y"]
+        return values
+
+    def encode(self, request: dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode a request dict.
+
+        :param request: The request dict, as sent to /predict.
+        :param out: Optional float32 array of length size to write into.
+        :return: The feature vector.
+        """
+        if out is None:
+            return np.array(self.values(request), dtype=np.float32)
+        out[:] = self.values(request)
+        return out
+
+    def encode_many(self, requests: Sequence[dict]) -> np.ndarray:
+        """
+        Encode a list of request dicts into one (len(requests), size) float32 matrix.
+
+        :param requests: The request dicts.
+        """
+        if not requests:
+            return np.empty((0, self.size), dtype=np.float32)
+        return np.array([self.values(request) for request in requests], dtype=np.float32)
+
+    def encode_state(self, state, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode a game state directly, without building the request dict first.
+
+        Gives the same vector as encode(state.to_request()).
+
+        :param state: The game state (a GameState or RaceSimulation).
+        :param out: Optional float32 array of length size to write into.
+        :return: The feature vector.
+        """
+        values = self._template.copy()
+        index = self._index
+        for sensor in state.sensors:
+            if sensor.reading is not None:
+                values[index[sensor.name]] = sensor.reading
+        ego = state.ego
+        i = self._velocity
+        values[i] = ego.velocity.x
+        values[i + 1] = ego.velocity.y
+        if self.coordinates:
+            values[i + 2] = ego.x
+            values[i + 3] = ego.y
+        if out is None:
+            return np.array(values, dtype=np.float32)
+        out[:] = values
+        return out
+
+    def __repr__(self) -> str:
+        return f"FeatureEncoder(coordinates={self.coordinates}, missing={self.missing})"
+
+
+ENCODER = FeatureEncoder()  # The default encoder, shared by RaceCarEnv observations and api.py
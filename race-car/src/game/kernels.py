@@ -0,0 +1,109 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, BatchRaceSimulation falls back to its NumPy code
+    njit = None
+
+'''
+Compiled per-tick update of the other cars of many games.
+
+npc_tick fuses what BatchRaceSimulation.update_cars, remove_passed_cars and place_cars do
+in "streams" mode into one pass over the games: move every car, apply its velocity jitter,
+retire cars out of range to the car bucket and spawn a car into an open lane. The random
+draws are the counter-based ones of src.mathematics.randomizer, computed inline, so the
+results are identical to the NumPy code. npc_tick is None when numba is not installed.
+'''
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_ONE = np.uint64(1)
+_UNIT = 1.0 / (1 << 53)
+
+
+def _uniform(key, counter):
+    # counter_uniform for one (key, counter) pair
+    z = key + (counter + _ONE) * _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    z = z ^ (z >> np.uint64(31))
+    return np.float64(z >> np.uint64(11)) * _UNIT
+
+
+def _npc_tick(alive, ego_vx, x, y, vx, w, h, lane, active, seq, placed, lane_slots, bucket, bucket_size,
+              jitter_keys, jitter_counters, spawn_keys, spawn_counters, lane_centers, screen_width,
+              offset_behind, offset_in_front, speed_spread, min_x, max_x, passed):
+    n, k = x.shape
+    lane_count = lane_slots.shape[1]
+    for g in range(n):
+        if not alive[g]:
+            continue
+
+        # Move and jitter
+        ego_speed = ego_vx[g]
+        for s in range(k):
+            passed[g, s] = False
+            if active[g, s]:
+                x[g, s] += vx[g, s] - ego_speed
+                vx[g, s] = (0.1 * (_uniform(jitter_keys[g, s], jitter_counters[g, s]) - 0.5) + 1) * vx[g, s]
+                jitter_counters[g, s] += _ONE
+                passed[g, s] = x[g, s] < min_x or x[g, s] > max_x
+
+        # Retire to the bucket in placement order
+        while True:
+            first = -1
+            for s in range(k):
+                if passed[g, s] and active[g, s] and (first < 0 or seq[g, s] < seq[g, first]):
+                    first = s
+            if first < 0:
+                break
+            active[g, first] = False
+            lane_slots[g, lane[g, first]] = -1
+            lane[g, first] = -1
+            bucket[g, bucket_size[g]] = first
+            bucket_size[g] += 1
+
+        # Spawn into a random open lane
+        cars = 0
+        for s in range(k):
+            if active[g, s]:
+                cars += 1
+        open_lanes = 0
+        for i in range(lane_count):
+            if lane_slots[g, i] < 0:
+                open_lanes += 1
+        if cars + 1 > lane_count or open_lanes == 0:
+            continue
+        counter = spawn_counters[g]
+        pick = int(_uniform(spawn_keys[g], counter) * open_lanes)
+        offset = offset_in_front if int(_uniform(spawn_keys[g], counter + _ONE) * 2) else offset_behind
+        coefficient = _uniform(spawn_keys[g], counter + np.uint64(2)) * speed_spread
+        spawn_counters[g] = counter + np.uint64(3)
+        if bucket_size[g] == 0:
+            continue
+
+        new_lane = -1
+        for i in range(lane_count):
+            if lane_slots[g, i] < 0:
+                if pick == 0:
+                    new_lane = i
+                    break
+                pick -= 1
+        bucket_size[g] -= 1
+        slot = bucket[g, bucket_size[g]]
+        vx[g, slot] = ego_speed + coefficient if offset == offset_behind else ego_speed - coefficient
+        x[g, slot] = (screen_width * offset) - (w[g, slot] // 2)
+        y[g, slot] = np.trunc(lane_centers[new_lane] - h[g, slot] / 2)
+        lane[g, slot] = new_lane
+        lane_slots[g, new_lane] = slot
+        active[g, slot] = True
+        seq[g, slot] = placed[g]
+        placed[g] += 1
+
+
+if njit is not None:
+    _uniform = njit(inline="always")(_uniform)
+    npc_tick = njit(cache=True, nogil=True)(_npc_tick)
+else:
+    npc_tick = None
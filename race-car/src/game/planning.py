@@ -0,0 +1,200 @@
+import math
+from typing import Callable, List, Optional, Union
+from .core import MAX_MS, MS_PER_TICK, SENSOR_OPTIONS
+from .scenario import default_scenario
+
+Policy = Callable[[dict], Union[str, List[str]]]
+_ANGLES = dict((name, angle) for angle, name in SENSOR_OPTIONS)
+
+
+class LocalModel:
+    def __init__(self, request: dict, ego_width: int, ego_height: int, wall_top: float, wall_bottom: float):
+        """
+        Initialize a kinematic copy of the game, rebuilt from one /predict request.
+
+        This is a kinematic approximation, not a copy of the simulator. The ego car follows
+        the exact game dynamics. Every sensor hit is kept as a point relative to the ego
+        car: points on a wall stay on the wall, points on another car are assumed to drive
+        at the ego car's speed of the request, since other cars' speeds are not part of it,
+        so they only move when the ego car changes its speed. Cars that no beam sees and
+        cars spawned later are not modeled at all; HorizonPlanner bounds the rest of the
+        error with its drift margin.
+
+        :param request: The request dict, as sent to /predict.
+        :param ego_width: The width of the ego car in pixels.
+        :param ego_height: The height of the ego car in pixels.
+        :param wall_top: The lowest y of the top wall.
+        :param wall_bottom: The highest y of the bottom wall.
+        """
+        self.vx = self.request_vx = request["velocity"]["x"]
+        self.vy = request["velocity"]["y"]
+        self.y = request["coordinates"]["y"]
+        self.elapsed = request["elapsed_time_ms"]
+        self.distance = request["distance"]
+        self.ego_width = ego_width
+        self.ego_height = ego_height
+        self.wall_top = wall_top
+        self.wall_bottom = wall_bottom
+        self.ticks = 0
+        self.shift = 0.0  # How far the other cars moved along the road relative to the ego car
+
+        center_y = int(self.y) + ego_height // 2
+        self.sensors = []  # (name, ux, uy, extent, hit x, hit y, hits a wall)
+        for name, reading in request["sensors"].items():
+            radians = math.radians(_ANGLES[name])
+            ux, uy = math.sin(radians), -math.cos(radians)  # Vector(0, -1) rotated like Sensor
+            extent = min(
+                ego_width / 2 / abs(ux) if abs(ux) > 1e-9 else math.inf,
+                ego_height / 2 / abs(uy) if abs(uy) > 1e-9 else math.inf,
+            )
+            if reading is None:
+                self.sensors.append((name, ux, uy, extent, None, None, False))
+                continue
+            hit_y = center_y + uy * reading
+            on_wall = hit_y <= wall_top + 1 or hit_y >= wall_bottom - 1
+            self.sensors.append((name, ux, uy, extent, ux * reading, hit_y, on_wall))
+
+    def step(self, action: str):
+        """Advance the ego car by one tick, like handle_action followed by Car.update."""
+        if action == "ACCELERATE":
+            self.vx += 0.1
+        elif action == "DECELERATE":
+            self.vx = max(self.vx - 0.1, 0)
+        elif action == "STEER_LEFT":
+            self.vy -= 0.1
+        elif action == "STEER_RIGHT":
+            self.vy += 0.1
+        self.y += self.vy
+        self.distance += self.vx
+        self.shift += self.request_vx - self.vx
+        self.elapsed += MS_PER_TICK
+        self.ticks += 1
+
+    def crashed(self) -> bool:
+        """Return True if the ego car touches a wall."""
+        return int(self.y) < self.wall_top or int(self.y) + self.ego_height > self.wall_bottom
+
+    def readings(self) -> dict:
+        """Predict what every sensor reads now."""
+        center_y = int(self.y) + self.ego_height // 2
+        shift = self.shift
+        readings = {}
+        for name, ux, uy, _, hit_x, hit_y, on_wall in self.sensors:
+            if hit_x is None:
+                readings[name] = None
+            elif on_wall:
+                wall_y = self.wall_top if uy < 0 else self.wall_bottom
+                readings[name] = max((wall_y - center_y) / uy, 0)
+            else:
+                readings[name] = max((hit_x + shift) * ux + (hit_y - center_y) * uy, 0)
+        return readings
+
+    def clearance(self) -> float:
+        """Return the smallest predicted gap between the ego car and another car along any beam."""
+        readings = self.readings()
+        gaps = [readings[name] - extent for name, _, _, extent, hit_x, _, on_wall in self.sensors if hit_x is not None and not on_wall]
+        return min(gaps, default=math.inf)
+
+    def to_request(self) -> dict:
+        """Describe the predicted game like a /predict request."""
+        return {
+            "did_crash": self.crashed(),
+            "elapsed_time_ms": int(self.elapsed),
+            "distance": self.distance,
+            "velocity": {"x": self.vx, "y": self.vy},
+            "coordinates": {"x": 0, "y": self.y},
+            "sensors": self.readings(),
+        }
+
+
+class HorizonPlanner:
+    def __init__(self, policy: Policy, min_actions: int = 1, max_actions: int = 60, safety_margin: float = 60, drift: Optional[float] = None, scenario=None):
+        """
+        Initialize a planner that answers each request with as many actions as it can trust.
+
+        The policy is rolled forward on a LocalModel of the game, so one request returns the
+        actions for every tick until the prediction gets unreliable: another car comes
+        closer than safety_margin plus drift pixels per planned tick, the ego car would hit
+        a wall, the game ends or max_actions is reached. The game plays the list tick by
+        tick, so every extra action is one round trip saved.
+
+        :param policy: A callable mapping a request dict to an action or list of actions.
+        :param min_actions: The fewest actions returned per request.
+        :param max_actions: The most actions returned per request.
+        :param safety_margin: The gap in pixels to other cars below which a fresh observation is needed.
+        :param drift: How many pixels per tick other cars may move relative to the prediction
+            (defaults to the scenario's spawn_speed_spread, the largest speed difference of
+            a newly placed car to the ego car).
+        :param scenario: The Scenario the game is played in (defaults to the standard game).
+        """
+        self.policy = policy
+        self.min_actions = min_actions
+        self.max_actions = max_actions
+        scenario = scenario or default_scenario()
+        self.safety_margin = safety_margin
+        self.drift = scenario.spawn_speed_spread if drift is None else drift
+        self.ego_width, self.ego_height = scenario.car_sizes["yellow"]
+        (_, top_y, _, top_height), (_, self.wall_bottom, _, _) = scenario.walls
+        self.wall_top = top_y + top_height
+
+        self.requests = 0
+        self.policy_calls = 0
+        self.planned_actions = 0
+        self.unplanned_actions = 0  # What the policy answered to the requests themselves
+        self.round_trips_saved = 0.0
+
+    def __call__(self, request: dict) -> List[str]:
+        """
+        Plan the actions for a request.
+
+        :param request: The request dict, as sent to /predict.
+        :return: At least the actions of the first policy call (and min_actions), at most max_actions.
+        """
+        model = LocalModel(request, self.ego_width, self.ego_height, self.wall_top, self.wall_bottom)
+        planned = []
+        prediction = request
+        keep = self.min_actions
+        answered = 0
+        while len(planned) < self.max_actions:
+            actions = self.policy(prediction)
+            self.policy_calls += 1
+            actions = [actions] if isinstance(actions, str) else list(actions)
+            if not actions:
+                break
+            if not planned:
+                keep = max(keep, len(actions))  # The policy's own answer is never cut short
+                answered = len(actions)
+            for action in actions:
+                model.step(action)
+                if len(planned) >= keep and not self._trusted(model):
+                    return self._finish(planned, answered)
+                planned.append(action)
+                if len(planned) == self.max_actions:
+                    break
+            prediction = model.to_request()
+        return self._finish(planned, answered)
+
+    def _trusted(self, model: LocalModel) -> bool:
+        if model.crashed() or model.elapsed > MAX_MS:
+            return False
+        return model.clearance() > self.safety_margin + self.drift * model.ticks
+
+    def _finish(self, planned: List[str], answered: int) -> List[str]:
+        self.requests += 1
+        self.planned_actions += len(planned)
+        self.unplanned_actions += answered
+        if answered:
+            # Without planning the game would request again after every answered actions
+            self.round_trips_saved += len(planned) / answered - 1
+        return planned
+
+    def metrics(self) -> dict:
+        """Return how many round trips the planned action lists saved, compared with the policy's own answers."""
+        return {
+            "requests": self.requests,
+            "policy_calls": self.policy_calls,
+            "planned_actions": self.planned_actions,
+            "unplanned_actions": self.unplanned_actions,
+            "mean_actions_per_request": round(self.planned_actions / self.requests, 2) if self.requests else None,
+            "round_trips_saved": round(self.round_trips_saved, 1),
+        }
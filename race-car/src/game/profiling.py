@@ -0,0 +1,204 @@
+import json
+import time
+import numpy as np
+from typing import List, Optional
+
+'''
+Opt-in per-tick instrumentation of the simulator.
+
+The simulator looks up PROFILER once per phase boundary and does nothing else while it is
+None, so profiling costs next to nothing when it is off. Install a TickProfiler with
+`with TickProfiler() as profiler:` (or game_loop(profiler=...)) and every tick played in
+that block is timed phase by phase into a ring buffer, together with a few work counters.
+'''
+
+PHASES = ("policy", "handle_action", "update_cars", "remove_passed_cars", "place_car", "sensors", "collisions", "output")
+COUNTERS = ("cars_sensed", "intersection_tests", "placements")
+
+# Phase and counter indices, for the hooks in the simulator
+POLICY, HANDLE_ACTION, UPDATE_CARS, REMOVE_PASSED_CARS, PLACE_CAR, SENSORS, COLLISIONS, OUTPUT = range(len(PHASES))
+CARS_SENSED, INTERSECTION_TESTS, PLACEMENTS = range(len(COUNTERS))
+
+_TICK, _START = 0, 1  # Row layout: tick, start in ns, phase durations in ns, counters
+_PHASE = 2
+_COUNTER = _PHASE + len(PHASES)
+
+PROFILER: Optional["TickProfiler"] = None
+
+
+class TickProfiler:
+    def __init__(self, capacity: int = 65536, path: Optional[str] = None, clock=time.perf_counter_ns):
+        """
+        Initialize a profiler that keeps the phase times and counters of the last capacity ticks.
+
+        :param capacity: The number of ticks kept; older ticks are overwritten.
+        :param path: Optional file the profile is saved to when the with block ends, see save.
+        :param clock: A function returning the time in integer nanoseconds.
+        """
+        self.capacity = capacity
+        self.path = path
+        self.clock = clock
+        self.rows: List[Optional[list]] = [None] * capacity
+        self.recorded = 0
+        self.tick = None
+        self._row = [0] * (_COUNTER + len(COUNTERS))  # Scratch row until the first tick begins
+        self._mark = clock()
+        self._previous = None
+
+    def begin(self, tick: int):
+        """
+        Start timing a tick. Calling it again for the same tick only restarts the phase clock.
+
+        :param tick: The tick number.
+        """
+        now = self.clock()
+        self._mark = now
+        if tick == self.tick:
+            return
+        row = [0] * (_COUNTER + len(COUNTERS))
+        row[_TICK] = tick
+        row[_START] = now
+        self.rows[self.recorded % self.capacity] = row
+        self.recorded += 1
+        self.tick = tick
+        self._row = row
+
+    def mark(self):
+        """Restart the phase clock, so time before this call is not charged to the next phase."""
+        self._mark = self.clock()
+
+    def lap(self, phase: int):
+        """
+        Charge the time since the last begin, mark or lap to a phase of the current tick.
+
+        :param phase: The phase index, for example SENSORS.
+        """
+        now = self.clock()
+        self._row[_PHASE + phase] += now - self._mark
+        self._mark = now
+
+    def count(self, counter: int, amount: int = 1):
+        """
+        Add to a counter of the current tick.
+
+        :param counter: The counter index, for example PLACEMENTS.
+        :param amount: The amount to add.
+        """
+        self._row[_COUNTER + counter] += amount
+
+    def __enter__(self):
+        global PROFILER
+        self._previous = PROFILER
+        PROFILER = self
+        return self
+
+    def __exit__(self, *exc):
+        global PROFILER
+        PROFILER = self._previous
+        self._previous = None
+        if self.path:
+            self.save(self.path)
+
+    def table(self) -> np.ndarray:
+        """Return the kept ticks, oldest first, as an int64 array of (tick, start ns, phases..., counters...) rows."""
+        if self.recorded <= self.capacity:
+            rows = self.rows[:self.recorded]
+        else:
+            start = self.recorded % self.capacity
+            rows = self.rows[start:] + self.rows[:start]
+        return np.array(rows, dtype=np.int64).reshape(len(rows), _COUNTER + len(COUNTERS))
+
+    def summary(self, slowest: int = 10) -> dict:
+        """
+        Summarize the kept ticks.
+
+        Every phase (and the whole tick) gets percentiles and a histogram with power-of-two
+        microsecond buckets, over the ticks in which the phase ran. The slowest ticks are listed with their phase breakdown and
+        counters, to show which phase blew up.
+
+        :param slowest: The number of slowest ticks to list.
+        :return: A JSON-serializable dict.
+        """
+        table = self.table()
+        durations = table[:, _PHASE:_COUNTER] / 1000
+        totals = durations.sum(axis=1)
+        columns = dict(zip(PHASES, durations.T))
+        columns["tick"] = totals
+
+        summary = {"ticks": len(table), "dropped": self.recorded - len(table), "phases_us": {}}
+        for name, values in columns.items():
+            summary["phases_us"][name] = _describe(values)
+        summary["counters_per_tick"] = {
+            name: round(float(values.mean()), 2) if len(values) else None for name, values in zip(COUNTERS, table[:, _COUNTER:].T)
+        }
+        order = np.argsort(totals)[::-1][:slowest]
+        summary["slowest_ticks"] = [
+            {
+                "tick": int(table[i, _TICK]),
+                "total_us": round(float(totals[i]), 1),
+                "phases_us": {name: round(float(value), 1) for name, value in zip(PHASES, durations[i])},
+                "counters": {name: int(value) for name, value in zip(COUNTERS, table[i, _COUNTER:])},
+            }
+            for i in order
+        ]
+        return summary
+
+    def format_summary(self, slowest: int = 5) -> str:
+        """Return the summary as a text table."""
+        summary = self.summary(slowest)
+        lines = [f"{'phase':<20}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}   (us, {summary['ticks']} ticks)"]
+        for name, stats in summary["phases_us"].items():
+            if stats["count"]:
+                lines.append(f"{name:<20}{stats['mean']:>10.1f}{stats['p50']:>10.1f}{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+        lines.append("Slowest ticks:")
+        for entry in summary["slowest_ticks"]:
+            worst = max(entry["phases_us"], key=entry["phases_us"].get)
+            lines.append(f"  tick {entry['tick']:>6}: {entry['total_us']:>9.1f} us, {worst} {entry['phases_us'][worst]:.1f} us, {entry['counters']}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """
+        Return the kept ticks in the Chrome trace event format (chrome://tracing, Perfetto).
+
+        Every tick is one event with its phases nested below it, laid out back to back from
+        the start of the tick, and the counters as counter tracks.
+        """
+        events = []
+        for row in self.table().tolist():
+            ts = row[_START] / 1000
+            durations = row[_PHASE:_COUNTER]
+            counters = dict(zip(COUNTERS, row[_COUNTER:]))
+            events.append({"name": "tick", "ph": "X", "pid": 1, "tid": 1, "ts": ts, "dur": sum(durations) / 1000,
+                           "args": {"tick": row[_TICK], **counters}})
+            offset = ts
+            for name, duration in zip(PHASES, durations):
+                if duration:
+                    events.append({"name": name, "ph": "X", "pid": 1, "tid": 1, "ts": offset, "dur": duration / 1000})
+                    offset += duration / 1000
+            events.append({"name": "counters", "ph": "C", "pid": 1, "ts": ts, "args": counters})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        """
+        Write the kept ticks to a file: a Chrome trace for paths ending in .trace.json, otherwise the summary.
+
+        :param path: The file path.
+        """
+        data = self.chrome_trace() if path.endswith(".trace.json") else self.summary()
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+def _describe(values: np.ndarray) -> dict:
+    values = values[values > 0]  # Ticks where the phase did not run are not samples
+    if not len(values):
+        return {"count": 0}
+    buckets = np.bincount(np.ceil(np.log2(np.maximum(values, 1))).astype(int))
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 2),
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "max": round(float(values.max()), 2),
+        "histogram": {f"<={2 ** i}": int(n) for i, n in enumerate(buckets) if n},
+    }
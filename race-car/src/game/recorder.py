@@ -0,0 +1,178 @@
+import json
+import os
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence
+from .core import ACTIONS, SENSOR_OPTIONS, SENSOR_INDEX
+
+MANIFEST = "manifest.json"
+# Column name -> (shape of one tick, dtype)
+COLUMNS = {
+    "episode": ((), np.int32),
+    "tick": ((), np.int32),
+    "sensors": ((len(SENSOR_OPTIONS),), np.float32),  # SENSOR_OPTIONS order, NaN for no reading
+    "velocity": ((2,), np.float32),
+    "position": ((2,), np.float32),
+    "distance": ((), np.float64),
+    "action": ((), np.int8),  # Index into ACTIONS
+    "crashed": ((), np.bool_),
+}
+_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+class TrajectoryRecorder:
+    def __init__(self, directory: str, chunk_size: int = 65536):
+        """
+        Initialize a recorder that streams ticks to a directory of columnar .npy chunks.
+
+        Every column is written as its own file per chunk (for example sensors_000003.npy),
+        and only one chunk is held in memory. The manifest is rewritten after each chunk, so
+        a partially written dataset can already be read.
+
+        :param directory: The output directory, created if needed.
+        :param chunk_size: The number of ticks per chunk.
+        """
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.buffers = {name: np.empty((chunk_size,) + shape, dtype=dtype) for name, (shape, dtype) in COLUMNS.items()}
+        self.rows = 0
+        self.chunks: List[int] = []
+        self.episode = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, state, action: str):
+        """
+        Append one tick, recorded after the game state was updated with the action.
+
+        :param state: The game state (a GameState or RaceSimulation).
+        :param action: The action applied this tick.
+        """
+        row = self.rows
+        buffers = self.buffers
+        buffers["episode"][row] = self.episode
+        buffers["tick"][row] = state.ticks
+        sensors = buffers["sensors"][row]
+        sensors[:] = np.nan
+        for sensor in state.sensors:
+            if sensor.reading is not None:
+                sensors[SENSOR_INDEX[sensor.name]] = sensor.reading
+        buffers["velocity"][row] = (state.ego.velocity.x, state.ego.velocity.y)
+        buffers["position"][row] = (state.ego.x, state.ego.y)
+        buffers["distance"][row] = state.distance
+        buffers["action"][row] = _CODES.get(action, 0)
+        buffers["crashed"][row] = state.crashed
+
+        self.rows += 1
+        if self.rows == self.chunk_size:
+            self.flush()
+
+    def end_episode(self):
+        """Start numbering the following ticks as a new episode."""
+        self.episode += 1
+
+    def flush(self):
+        """Write the buffered ticks as a new chunk."""
+        if not self.rows:
+            return
+        index = len(self.chunks)
+        for name, buffer in self.buffers.items():
+            np.save(os.path.join(self.directory, _chunk_file(name, index)), buffer[:self.rows])
+        self.chunks.append(self.rows)
+        self.rows = 0
+        self._write_manifest()
+
+    def close(self):
+        """Write the remaining ticks and the final manifest."""
+        self.flush()
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = {
+            "columns": {name: {"shape": list(shape), "dtype": np.dtype(dtype).str} for name, (shape, dtype) in COLUMNS.items()},
+            "actions": ACTIONS,
+            "sensors": [name for _, name in SENSOR_OPTIONS],
+            "chunks": self.chunks,
+            "rows": sum(self.chunks),
+        }
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryDataset:
+    def __init__(self, directory: str):
+        """
+        Open a recorded dataset. Chunks are memory-mapped, nothing is read up front.
+
+        :param directory: The directory written by a TrajectoryRecorder.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.chunks: List[int] = self.manifest["chunks"]
+        self.offsets = np.concatenate([[0], np.cumsum(self.chunks)]).astype(np.int64)
+        self._maps: Dict[str, List[np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def column(self, name: str) -> List[np.ndarray]:
+        """
+        Return the memory-mapped chunks of one column.
+
+        :param name: The column name, see COLUMNS.
+        """
+        if name not in self._maps:
+            self._maps[name] = [
+                np.load(os.path.join(self.directory, _chunk_file(name, index)), mmap_mode="r")
+                for index in range(len(self.chunks))
+            ]
+        return self._maps[name]
+
+    def read(self, start: int, stop: int, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Read the rows [start, stop) of some columns into arrays (empty arrays for an empty range).
+
+        :param start: The first row.
+        :param stop: One past the last row.
+        :param columns: The columns to read (defaults to all).
+        :return: A dict of column name to array.
+        """
+        columns = columns or list(self.manifest["columns"])
+        first = int(np.searchsorted(self.offsets, start, side="right")) - 1
+        last = int(np.searchsorted(self.offsets, stop, side="left"))
+        batch = {}
+        for name in columns:
+            chunks = self.column(name)
+            pieces = []
+            for index in range(max(first, 0), min(last, len(chunks))):
+                lo = max(start - self.offsets[index], 0)
+                hi = min(stop - self.offsets[index], self.chunks[index])
+                if hi > lo:
+                    pieces.append(chunks[index][lo:hi])
+            if not pieces:
+                shape, dtype = COLUMNS[name]
+                batch[name] = np.empty((0,) + shape, dtype=dtype)
+            else:
+                batch[name] = np.concatenate(pieces) if len(pieces) > 1 else np.array(pieces[0])
+        return batch
+
+    def batches(self, batch_size: int, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over the dataset in order, batch_size rows at a time.
+
+        :param batch_size: The number of rows per batch (the last batch may be smaller).
+        :param columns: The columns to read (defaults to all).
+        """
+        for start in range(0, len(self), batch_size):
+            yield self.read(start, min(start + batch_size, len(self)), columns)
+
+
+def _chunk_file(name: str, index: int) -> str:
+    return f"{name}_{index:06d}.npy"
@@ -0,0 +1,177 @@
+import os
+import queue
+import threading
+import numpy as np
+import pygame
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+@lru_cache(maxsize=None)
+def get_font(name: str = "monospace", size: int = 16) -> pygame.font.Font:
+    """
+    Return a system font, resolved and loaded only on the first call.
+
+    :param name: The system font name.
+    :param size: The font size in points.
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.SysFont(name, size)
+
+
+class Renderer:
+    def __init__(self, road):
+        """
+        Initialize a renderer that only redraws the parts of the screen that changed.
+
+        The road and the walls never move, so they are composited into one background
+        surface once. Each frame the areas drawn in the previous frame are restored from
+        that background, and only those areas and the new drawings are sent to the display.
+
+        :param road: The road of the game to draw.
+        """
+        self.background = road.surface.copy()
+        for wall in road.walls:
+            wall.draw(self.background)
+        self.background = self.background.convert() if pygame.display.get_surface() else self.background
+        self.font = get_font("monospace", 16)
+        self._previous: List[pygame.Rect] = []
+        self._full = True
+
+    def draw(self, screen: pygame.Surface, state) -> List[pygame.Rect]:
+        """
+        Draw one frame.
+
+        :param screen: The display surface.
+        :param state: The game state to draw.
+        :return: The screen areas that changed, for pygame.display.update.
+        """
+        if self._full:
+            screen.blit(self.background, (0, 0))
+        else:
+            for rect in self._previous:
+                screen.blit(self.background, rect, rect)
+
+        drawn = []
+        for car in state.cars:
+            if car.sprite:
+                drawn.append(screen.blit(car.sprite, (car.x, car.y)))
+                color = (255, 0, 0) if car == state.ego else (0, 255, 0)
+                drawn.append(pygame.draw.rect(screen, color, car.get_bounds(), width=2))
+            else:
+                drawn.append(pygame.draw.rect(screen, (255, 255, 0) if car == state.ego else (0, 0, 255), car.rect))
+
+        if state.sensors_enabled:
+            for sensor in state.sensors:
+                drawn.append(sensor.draw(screen, self.font))
+
+        if self._full:
+            self._full = False
+            changed = [screen.get_rect()]
+        else:
+            changed = self._previous + drawn
+        self._previous = [rect.clip(screen.get_rect()) for rect in drawn if rect]
+        return changed
+
+    def invalidate(self):
+        """Redraw the whole screen on the next frame, for example after the window was resized."""
+        self._full = True
+
+
+class FrameExporter:
+    def __init__(self, directory: str, road, resolution: Optional[Tuple[int, int]] = None, stride: int = 1,
+                 format: str = "npy", chunk_frames: int = 256, queue_size: int = 16):
+        """
+        Initialize an exporter that renders frames offscreen and writes them on a background thread.
+
+        Frames are drawn by a Renderer into an offscreen surface, so no window is opened.
+        The simulation thread only draws, scales and copies the pixels; encoding and writing
+        happen on the writer thread. With format "npy" frames are stored as uint8 (frames, height,
+        width, 3) arrays of chunk_frames frames each (frames_000000.npy, ...) next to a
+        ticks_000000.npy with the tick of every frame. With format "png" every frame is
+        written as frame_<tick>.png.
+
+        :param directory: The output directory, created if needed.
+        :param road: The road of the game, for the static background.
+        :param resolution: The (width, height) of exported frames (defaults to the road size).
+        :param stride: Export every stride-th tick.
+        :param format: "npy" or "png".
+        :param chunk_frames: The number of frames per .npy chunk.
+        :param queue_size: The number of frames that may wait for the writer before capture blocks.
+        """
+        if format not in ("npy", "png"):
+            raise ValueError(f"Unknown frame format {format!r}, use 'npy' or 'png'")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.surface = pygame.Surface(road.surface.get_size())
+        self.renderer = Renderer(road)
+        self.resolution = tuple(resolution) if resolution else self.surface.get_size()
+        self.stride = stride
+        self.format = format
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self.error = None
+        self._scaled = None if self.resolution == self.surface.get_size() else pygame.Surface(self.resolution)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write, name="frame-exporter", daemon=True)
+        self._thread.start()
+
+    def capture(self, state) -> bool:
+        """
+        Render the state and queue the frame if its tick is on the stride.
+
+        :param state: The game state to draw.
+        :return: True if a frame was queued.
+        """
+        if state.ticks % self.stride:
+            return False
+        if self.error is not None:
+            raise RuntimeError("Frame export failed") from self.error
+        self.renderer.draw(self.surface, state)
+        frame = self.surface
+        if self._scaled is not None:
+            pygame.transform.smoothscale(self.surface, self.resolution, self._scaled)
+            frame = self._scaled
+        self._queue.put((state.ticks, pygame.image.tobytes(frame, "RGB")))
+        self.frames += 1
+        return True
+
+    def close(self):
+        """Wait until every queued frame is written."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self.error is not None:
+            raise RuntimeError("Frame export failed") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self):
+        width, height = self.resolution
+        ticks, frames, chunk = [], [], 0
+        try:
+            while True:
+                item = self._queue.get()
+                if item is not None:
+                    tick, pixels = item
+                    if self.format == "png":
+                        image = pygame.image.frombuffer(pixels, self.resolution, "RGB")
+                        pygame.image.save(image, os.path.join(self.directory, f"frame_{tick:06d}.png"))
+                        continue
+                    ticks.append(tick)
+                    frames.append(np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3))
+                if frames and (item is None or len(frames) == self.chunk_frames):
+                    np.save(os.path.join(self.directory, f"frames_{chunk:06d}.npy"), np.stack(frames))
+                    np.save(os.path.join(self.directory, f"ticks_{chunk:06d}.npy"), np.array(ticks, dtype=np.int32))
+                    ticks, frames, chunk = [], [], chunk + 1
+                if item is None:
+                    return
+        except Exception as error:  # Reported to the simulation thread on the next capture or close
+            self.error = error
+            while self._queue.get() is not None:
+                pass
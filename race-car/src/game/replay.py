@@ -0,0 +1,147 @@
+import json
+import os
+import struct
+import numpy as np
+from typing import Iterable, Optional
+from .core import ACTIONS, RaceSimulation
+
+BINARY_MAGIC = b"RCAL"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<4sBII")  # magic, version, first tick, tick count
+_CODES = {name: code for code, name in enumerate(ACTIONS)}
+_CACHE = {}  # path -> (modification time in ns, ActionLog)
+
+
+class ActionLog:
+    def __init__(self, codes: np.ndarray, first_tick: int = 1):
+        """
+        Initialize a tick-indexed action log.
+
+        :param codes: Action codes (indices into ACTIONS) for consecutive ticks.
+        :param first_tick: The tick of codes[0]. Ticks outside the log replay as 'NOTHING'.
+        """
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.first_tick = first_tick
+        self._actions = [ACTIONS[code] for code in self.codes.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def action(self, tick: int) -> str:
+        """
+        Return the action logged for a tick.
+
+        :param tick: The tick, as counted by the game (the first tick is 1).
+        :return: The action name, 'NOTHING' if the tick is not in the log.
+        """
+        index = tick - self.first_tick
+        if 0 <= index < len(self._actions):
+            return self._actions[index]
+        return "NOTHING"
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> "ActionLog":
+        """
+        Build a log from {"tick": ..., "action": ...} entries, like ACTION_LOG.
+
+        Later entries for the same tick win; ticks without an entry replay as 'NOTHING'.
+        """
+        ticks = {}
+        for entry in entries:
+            tick = entry.get("tick")
+            if tick is not None:
+                ticks[tick] = _CODES.get(entry.get("action", "NOTHING"), 0)
+        if not ticks:
+            return cls(np.zeros(0, dtype=np.int8))
+
+        first_tick = min(ticks)
+        codes = np.zeros(max(ticks) - first_tick + 1, dtype=np.int8)
+        for tick, code in ticks.items():
+            codes[tick - first_tick] = code
+        return cls(codes, first_tick)
+
+    @classmethod
+    def load(cls, path: str) -> "ActionLog":
+        """
+        Load a log from a .json list, a .jsonl stream or a compact binary (.bin) file.
+
+        :param path: The file path. The format is picked from the extension.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".bin":
+            with open(path, "rb") as f:
+                magic, version, first_tick, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != BINARY_MAGIC or version != BINARY_VERSION:
+                    raise ValueError(f"{path} is not a version {BINARY_VERSION} action log")
+                codes = np.frombuffer(f.read(count), dtype=np.int8)
+            return cls(codes, first_tick)
+
+        with open(path, "r") as f:
+            if extension == ".jsonl":
+                return cls.from_entries(json.loads(line) for line in f if line.strip())
+            return cls.from_entries(json.load(f))
+
+    def save(self, path: str):
+        """
+        Write the log as .json, .jsonl or compact binary (.bin), picked from the extension.
+
+        :param path: The file path.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".bin":
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, self.first_tick, len(self.codes)))
+                f.write(self.codes.tobytes())
+            return
+
+        entries = ({"tick": self.first_tick + i, "action": action} for i, action in enumerate(self._actions))
+        with open(path, "w") as f:
+            if extension == ".jsonl":
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            else:
+                json.dump(list(entries), f, indent=2)
+
+
+def cached_action_log(path: str) -> Optional[ActionLog]:
+    """
+    Return the action log at path, loading it again only when the file has changed.
+
+    The log is cached under its path together with the file's modification time, so a
+    rewritten log is picked up by the next call.
+
+    :param path: The file path.
+    :return: The log, or None if the file does not exist.
+    """
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _CACHE.pop(path, None)
+        return None
+    cached = _CACHE.get(path)
+    if cached is None or cached[0] != modified:
+        try:
+            cached = _CACHE[path] = (modified, ActionLog.load(path))
+        except FileNotFoundError:
+            return None
+    return cached[1]
+
+
+def clear_action_log_cache():
+    """Forget every log loaded by cached_action_log."""
+    _CACHE.clear()
+
+
+def replay(log: ActionLog, seed_value, sensor_removal: int = 0) -> RaceSimulation:
+    """
+    Play a logged game again at full speed.
+
+    :param log: The actions to replay.
+    :param seed_value: The seed the game was played with.
+    :param sensor_removal: The number of random sensors removed from the ego car.
+    :return: The simulation after the game has ended.
+    """
+    sim = RaceSimulation(seed_value, sensor_removal)
+    while not sim.done:
+        sim.step(log.action(sim.ticks + 1))
+    return sim
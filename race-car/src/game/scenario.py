@@ -0,0 +1,152 @@
+import json
+import numpy as np
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..elements.car import Car
+from ..elements.road import Road
+from ..mathematics.vector import Vector
+from .core import SCREEN_WIDTH, SCREEN_HEIGHT, LANE_COUNT, MAX_TICKS, SENSOR_OPTIONS
+
+_ANGLES = {name: angle for angle, name in SENSOR_OPTIONS}
+
+
+class Scenario:
+    def __init__(
+        self,
+        name: str = "default",
+        screen_width: int = SCREEN_WIDTH,
+        screen_height: int = SCREEN_HEIGHT,
+        lane_count: int = LANE_COUNT,
+        npc_count: Optional[int] = None,
+        npc_colors: Sequence[str] = ("blue", "red"),
+        sensors: Optional[Sequence[str]] = None,
+        sensor_range: float = 1000,
+        ego_speed: float = 10,
+        npc_speed: float = 8,
+        spawn_speed_spread: float = 5,
+        spawn_offsets: Sequence[float] = (-0.5, 1.5),
+        retire_distance: float = 1000,
+        max_ticks: int = MAX_TICKS,
+    ):
+        """
+        Initialize a scenario and precompile its lookup tables.
+
+        The defaults describe the standard game. Everything a simulation needs per tick or
+        per spawn (lane centers, car sizes, sensor beam vectors) is computed here once, so
+        any number of simulations can share one Scenario.
+
+        :param name: A name for reports.
+        :param screen_width: The width of the road in pixels.
+        :param screen_height: The height of the road in pixels, walls included.
+        :param lane_count: The number of lanes.
+        :param npc_count: The number of other cars in the car bucket (defaults to lane_count - 1).
+        :param npc_colors: The colors other cars are drawn from.
+        :param sensors: The names of the ego car's sensors, from SENSOR_OPTIONS (defaults to all).
+        :param sensor_range: The reach of every sensor in pixels.
+        :param ego_speed: The starting speed of the ego car.
+        :param npc_speed: The speed other cars have before they are first placed.
+        :param spawn_speed_spread: The largest speed difference of a newly placed car to the ego car.
+        :param spawn_offsets: The x positions, as fractions of screen_width, behind and in front of the ego car where cars spawn.
+        :param retire_distance: How far off screen a car may drive before it is returned to the bucket.
+        :param max_ticks: The tick budget of a game.
+        """
+        sensors = [name for _, name in SENSOR_OPTIONS] if sensors is None else list(sensors)
+        unknown = [sensor for sensor in sensors if sensor not in _ANGLES]
+        if unknown:
+            raise ValueError(f"Unknown sensors {unknown}, choose from {list(_ANGLES)}")
+        if len(spawn_offsets) != 2:
+            raise ValueError("spawn_offsets needs the offset behind and the offset in front of the ego car")
+
+        self.name = name
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.lane_count = lane_count
+        self.npc_count = lane_count - 1 if npc_count is None else npc_count
+        self.npc_colors = list(npc_colors)
+        self.sensor_range = sensor_range
+        self.ego_speed = ego_speed
+        self.npc_speed = npc_speed
+        self.spawn_speed_spread = spawn_speed_spread
+        self.spawn_offsets = tuple(spawn_offsets)
+        self.retire_distance = retire_distance
+        self.max_ticks = max_ticks
+
+        # Sensors keep the SENSOR_OPTIONS order, so random sensor removal does not depend on the file
+        chosen = set(sensors)
+        self.sensors: List[Tuple[float, str]] = [(angle, name) for angle, name in SENSOR_OPTIONS if name in chosen]
+        self.sensor_mask = np.array([name in chosen for _, name in SENSOR_OPTIONS])
+        self.sensor_vectors = np.array([Vector(0, -sensor_range).rotate(angle).to_array() for angle, _ in SENSOR_OPTIONS])
+        self.beam_vectors: Dict[str, Tuple[float, float]] = {
+            name: tuple(vector) for (_, name), vector in zip(SENSOR_OPTIONS, self.sensor_vectors.tolist())
+        }
+
+        road = self.build_road()
+        self.lane_height = road.get_lane_height()
+        self.car_height = int(self.lane_height * 0.8)
+        self.lane_centers = [(lane.y_start + lane.y_end) / 2 for lane in road.lanes]
+        self.walls = [(wall.rect.x, wall.rect.y, wall.rect.width, wall.rect.height) for wall in road.walls]
+        self.car_sizes = {color: _car_size(color, self.car_height) for color in {"yellow", *self.npc_colors}}
+
+    def build_road(self) -> Road:
+        """Return a new road of the scenario's size."""
+        return Road(self.screen_width, self.screen_height, self.lane_count)
+
+    def to_dict(self) -> dict:
+        """Return the scenario in the file format."""
+        return {
+            "name": self.name,
+            "screen_width": self.screen_width,
+            "screen_height": self.screen_height,
+            "lane_count": self.lane_count,
+            "npc_count": self.npc_count,
+            "npc_colors": self.npc_colors,
+            "sensors": [name for _, name in self.sensors],
+            "sensor_range": self.sensor_range,
+            "ego_speed": self.ego_speed,
+            "npc_speed": self.npc_speed,
+            "spawn_speed_spread": self.spawn_speed_spread,
+            "spawn_offsets": list(self.spawn_offsets),
+            "retire_distance": self.retire_distance,
+            "max_ticks": self.max_ticks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Scenario":
+        """
+        Build a scenario from a dict in the file format. Missing keys keep their defaults.
+
+        :param data: The scenario fields, see __init__.
+        """
+        return cls(**data)
+
+    def __reduce__(self):
+        # Worker processes recompile the tables instead of unpickling them
+        return Scenario.from_dict, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"Scenario({self.name!r})"
+
+
+def load_scenarios(path: str) -> List[Scenario]:
+    """
+    Load the scenarios of a JSON file holding one scenario object or a list of them.
+
+    :param path: The file path.
+    :return: The compiled scenarios.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [Scenario.from_dict(entry) for entry in data]
+
+
+@lru_cache(maxsize=None)
+def default_scenario() -> Scenario:
+    """Return the standard game, compiled once."""
+    return Scenario()
+
+
+def _car_size(color: str, target_height: int) -> Tuple[int, int]:
+    car = Car(color, Vector(0, 0), target_height=target_height)
+    return car.width, car.height
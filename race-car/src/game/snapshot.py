@@ -0,0 +1,78 @@
+import random
+from typing import NamedTuple, Optional, Tuple
+
+
+class Snapshot(NamedTuple):
+    """
+    The mutable part of a game at one tick.
+
+    Cars are referenced, not copied: a snapshot can only be restored into the game it was
+    taken from. Sprites, the road and the sensors themselves are never copied.
+    """
+    ticks: int
+    elapsed_game_time: float
+    distance: float
+    crashed: bool
+    latest_action: str
+    cars: Tuple[tuple, ...]          # (car, x, y, velocity x, velocity y, lane) in driving order
+    car_bucket: tuple
+    readings: Tuple[Optional[float], ...]
+    texts: Tuple[str, ...]
+    rng_state: tuple
+
+
+def take_snapshot(state, rng: random.Random) -> Snapshot:
+    """
+    Capture the state of a game and its random generator.
+
+    :param state: The game state (a GameState or RaceSimulation).
+    :param rng: The random generator driving the game (a random.Random or RandomStreams).
+    :return: The snapshot.
+    """
+    return Snapshot(
+        state.ticks,
+        state.elapsed_game_time,
+        state.distance,
+        state.crashed,
+        state.latest_action,
+        tuple((car, car.x, car.y, car.velocity.x, car.velocity.y, car.lane) for car in state.cars),
+        tuple(state.car_bucket),
+        tuple(sensor.reading for sensor in state.sensors),
+        tuple(sensor.text for sensor in state.sensors),
+        rng.getstate(),
+    )
+
+
+def restore_snapshot(state, rng: random.Random, snapshot: Snapshot):
+    """
+    Put a game and its random generator back to a snapshot.
+
+    :param state: The game state the snapshot was taken from.
+    :param rng: The random generator driving the game (a random.Random or RandomStreams).
+    :param snapshot: The snapshot to restore.
+    """
+    state.ticks = snapshot.ticks
+    state.elapsed_game_time = snapshot.elapsed_game_time
+    state.distance = snapshot.distance
+    state.crashed = snapshot.crashed
+    state.latest_action = snapshot.latest_action
+
+    cars = []
+    for car, x, y, velocity_x, velocity_y, lane in snapshot.cars:
+        car.x = x
+        car.y = y
+        car.velocity.x = velocity_x
+        car.velocity.y = velocity_y
+        car.lane = lane
+        cars.append(car)
+    state.cars = cars
+
+    state.car_bucket = list(snapshot.car_bucket)
+    for car in state.car_bucket:
+        car.lane = None
+
+    for sensor, reading, text in zip(state.sensors, snapshot.readings, snapshot.texts):
+        sensor.reading = reading
+        sensor.text = text
+
+    rng.setstate(snapshot.rng_state)
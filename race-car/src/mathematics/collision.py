@@ -1,3 +1,5 @@
+import math
+import numpy as np
 import pygame
 from .vector import Vector  # Assuming a Vector class exists
 from typing import Optional, List
@@ -22,35 +24,81 @@ def intersects(a: pygame.Rect, b: pygame.Rect) -> bool:
         a.y < b.y + b.height
     )
 
-def get_intersection_point(v: Line, u: Line) -> Optional[Vector]:
+def get_intersection_point(v: Line, u: Line, out: Optional[Vector] = None) -> Optional[Vector]:
     """
     Get the intersection point of two lines, if it exists.
 
     :param v: The first line.
     :param u: The second line.
-    :return: The intersection point as a Vector, or None if no intersection exists.
+    :param out: Optional preallocated Vector to write the point into, so no Vector is allocated.
+    :return: The intersection point as a Vector (out if given), or None if no intersection exists.
     """
-    b = v.end.sub(v.start)
-    d = u.end.sub(u.start)
-    bxd = b.cross(d)
+    t = segment_intersection(
+        v.start.x, v.start.y, v.end.x - v.start.x, v.end.y - v.start.y,
+        u.start.x, u.start.y, u.end.x, u.end.y
+    )
+    if t is None:
+        return None
+    x = v.start.x + (v.end.x - v.start.x) * t
+    y = v.start.y + (v.end.y - v.start.y) * t
+    if out is None:
+        return Vector(x, y)
+    return out.set(x, y)
+
+def segment_intersection(sx: float, sy: float, bx: float, by: float, ux0: float, uy0: float, ux1: float, uy1: float) -> Optional[float]:
+    """
+    Intersect the segment (sx, sy) + t * (bx, by) with the segment from (ux0, uy0) to (ux1, uy1).
+
+    Works on plain numbers so it allocates no Vector or Line objects.
+
+    :return: The parameter t in [0, 1] of the intersection on the first segment, or None.
+    """
+    dx = ux1 - ux0
+    dy = uy1 - uy0
+    bxd = bx * dy - by * dx
 
     if bxd == 0:
         # Parallel lines, no intersection
         return None
 
-    c = u.start.sub(v.start)
-    t = (c.x * d.y - c.y * d.x) / bxd
+    cx = ux0 - sx
+    cy = uy0 - sy
+    t = (cx * dy - cy * dx) / bxd
 
     if t < 0 or t > 1:
         return None
 
-    w = (c.x * b.y - c.y * b.x) / bxd
+    w = (cx * by - cy * bx) / bxd
 
     if w < 0 or w > 1:
         return None
 
-    intersection = v.start.add(b.scale(t))
-    return intersection
+    return t
+
+def segment_rectangle_distance(sx: float, sy: float, bx: float, by: float, left: float, top: float, right: float, bottom: float) -> Optional[float]:
+    """
+    Distance from the start of the segment (sx, sy) + t * (bx, by) to its closest crossing with a rectangle's edges.
+
+    Gives the same result as intersecting the segment with every line of get_lines_of_rectangle,
+    without allocating the lines.
+
+    :return: The distance, or None if the segment does not cross the rectangle's edges.
+    """
+    min_distance = None
+    for ux0, uy0, ux1, uy1 in (
+        (left, bottom, right, bottom),   # Bottom
+        (right, bottom, right, top),     # Right
+        (left, top, right, top),         # Top
+        (left, top, left, bottom),       # Left
+    ):
+        t = segment_intersection(sx, sy, bx, by, ux0, uy0, ux1, uy1)
+        if t is not None:
+            ix = sx + bx * t
+            iy = sy + by * t
+            distance = math.sqrt((ix - sx) ** 2 + (iy - sy) ** 2)
+            if min_distance is None or distance < min_distance:
+                min_distance = distance
+    return min_distance
 
 def get_lines_of_rectangle(r: pygame.Rect) -> List[Line]:
     """
@@ -69,4 +117,48 @@ def get_lines_of_rectangle(r: pygame.Rect) -> List[Line]:
         Line(bot_right, top_right),  # Right
         Line(top_left, top_right),   # Top
         Line(top_left, bot_left),    # Left
-    ]
\ No newline at end of file
+    ]
+
+def swept_aabb(boxes: np.ndarray, displacements: np.ndarray, targets: np.ndarray,
+               target_displacements: Optional[np.ndarray] = None, valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Find when moving boxes first overlap other moving boxes during one step, for many games at once.
+
+    Both boxes move in a straight line from their start position to start + displacement.
+    Overlap is strict like intersects: boxes that only touch do not collide. Unlike
+    checking the end positions, a box that passes through another within the step is found.
+
+    :param boxes: The moving boxes at the start of the step as (x, y, width, height), shape (N, 4).
+    :param displacements: The movement of every box over the step, shape (N, 2).
+    :param targets: The boxes to test against at the start of the step, shape (N, B, 4).
+    :param target_displacements: The movement of every target, shape (N, B, 2) (defaults to static targets).
+    :param valid: Optional mask of targets to consider, shape (N, B).
+    :return: The fraction of the step at which the boxes first overlap, shape (N, B). 0 if they
+        overlap at the start, inf if they never overlap during the step.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64)[:, None, :]                       # (N, 1, 4)
+    targets = np.asarray(targets, dtype=np.float64)                                # (N, B, 4)
+    motion = np.broadcast_to(np.asarray(displacements, dtype=np.float64)[:, None, :], targets.shape[:2] + (2,))
+    if target_displacements is not None:
+        motion = motion - np.asarray(target_displacements, dtype=np.float64)       # Relative to the targets
+
+    enter = np.full(targets.shape[:2], -np.inf)
+    leave = np.full(targets.shape[:2], np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for axis in (0, 1):
+            # The box overlaps the target on this axis while low < position < high
+            position = boxes[..., axis]
+            low = targets[..., axis] - boxes[..., axis + 2]
+            high = targets[..., axis] + targets[..., axis + 2]
+            speed = motion[..., axis]
+            t_low = (low - position) / speed
+            t_high = (high - position) / speed
+            moving = speed != 0
+            inside = (low < position) & (position < high)
+            enter = np.maximum(enter, np.where(moving, np.minimum(t_low, t_high), np.where(inside, -np.inf, np.inf)))
+            leave = np.minimum(leave, np.where(moving, np.maximum(t_low, t_high), np.where(inside, np.inf, -np.inf)))
+
+    hit = (enter < leave) & (enter < 1) & (leave > 0)
+    if valid is not None:
+        hit &= valid
+    return np.where(hit, np.maximum(enter, 0), np.inf)
@@ -1,4 +1,7 @@
+import hashlib
 import random
+import numpy as np
+from typing import Optional
 
 rng = None  # Global random number generator instance
 
@@ -25,4 +28,149 @@ def random_number():
     """
     if rng is None:
         raise RuntimeError("RNG not seeded.")
-    return rng.random()
\ No newline at end of file
+    return rng.random()
+
+# Counter-based streams: draw n of a stream is a pure function of (stream key, n), so any
+# draw of any game can be computed on its own, in any order and in bulk with NumPy.
+PURPOSES = ("sensors", "colors", "spawn", "jitter")  # One stream per purpose and game
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+
+
+def _mix(z: int) -> int:
+    """The SplitMix64 finalizer on a Python int."""
+    z = ((z ^ (z >> 30)) * _MIX1) & _MASK
+    z = ((z ^ (z >> 27)) * _MIX2) & _MASK
+    return z ^ (z >> 31)
+
+
+def seed_key(seed_value) -> int:
+    """
+    Derive a stable 64-bit key from a seed, identical across processes and machines.
+
+    :param seed_value: The seed (None draws a fresh key from the OS).
+    :return: The key.
+    """
+    if seed_value is None:
+        return random.SystemRandom().getrandbits(64)
+    digest = hashlib.blake2b(f"{type(seed_value).__name__}:{seed_value}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def stream_key(key: int, purpose: str, index: int = 0) -> int:
+    """
+    Derive the key of one stream of a game.
+
+    :param key: The game key from seed_key.
+    :param purpose: One of PURPOSES.
+    :param index: Sub-stream number, for example the car a jitter stream belongs to.
+    :return: The stream key.
+    """
+    return _mix((key + (PURPOSES.index(purpose) + 1) * _GOLDEN + _mix(index + 1)) & _MASK)
+
+
+def counter_uniform(keys: np.ndarray, counters: np.ndarray) -> np.ndarray:
+    """
+    Draw uniform floats in [0, 1) for many (stream key, counter) pairs at once.
+
+    Gives exactly the values CounterRandom.random returns for the same key and counter.
+
+    :param keys: uint64 stream keys.
+    :param counters: uint64 draw numbers, broadcast against keys.
+    :return: float64 array of draws.
+    """
+    with np.errstate(over="ignore"):
+        z = np.asarray(keys, dtype=np.uint64) + (np.asarray(counters, dtype=np.uint64) + np.uint64(1)) * np.uint64(_GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class CounterRandom:
+    def __init__(self, key: int, counter: int = 0):
+        """
+        Initialize a counter-based stream with the random.Random methods the game uses.
+
+        :param key: The stream key, see stream_key.
+        :param counter: The number of the next draw.
+        """
+        self.key = key
+        self.counter = counter
+
+    def random(self) -> float:
+        """Return the next float in [0, 1)."""
+        z = _mix((self.key + (self.counter + 1) * _GOLDEN) & _MASK)
+        self.counter += 1
+        return (z >> 11) * (1.0 / (1 << 53))
+
+    def choice(self, seq):
+        """Return a random element of a non-empty sequence."""
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[int(self.random() * len(seq))]
+
+    def getstate(self) -> int:
+        return self.counter
+
+    def setstate(self, state: int):
+        self.counter = state
+
+
+class RandomStreams:
+    def __init__(self, seed_value=None, mode: str = "compat", rng: Optional[random.Random] = None):
+        """
+        Initialize the random streams of one game.
+
+        In "compat" mode every purpose shares one random.Random, which reproduces the
+        original single-stream game exactly. In "streams" mode every purpose (and every
+        car's velocity jitter) gets its own CounterRandom, so draws for one purpose never
+        shift another and batched simulations can compute them in bulk.
+
+        :param seed_value: The seed of the game.
+        :param mode: "compat" or "streams".
+        :param rng: An already seeded generator to share in compat mode.
+        """
+        if mode not in ("compat", "streams"):
+            raise ValueError(f"Unknown RNG mode {mode!r}, use 'compat' or 'streams'")
+        self.mode = mode
+        self._cars = {}
+        if mode == "compat":
+            self.shared = rng if rng is not None else random.Random(seed_value)
+            self.sensors = self.colors = self.spawn = self.shared
+        else:
+            self.shared = None
+            self.key = seed_key(seed_value)
+            self.sensors = CounterRandom(stream_key(self.key, "sensors"))
+            self.colors = CounterRandom(stream_key(self.key, "colors"))
+            self.spawn = CounterRandom(stream_key(self.key, "spawn"))
+
+    def jitter(self, index: int):
+        """
+        Return the velocity jitter stream of a car.
+
+        :param index: The number of the car in the game's car bucket.
+        """
+        if self.shared is not None:
+            return self.shared
+        if index not in self._cars:
+            self._cars[index] = CounterRandom(stream_key(self.key, "jitter", index))
+        return self._cars[index]
+
+    def getstate(self):
+        """Return the state of every stream, for snapshots."""
+        if self.shared is not None:
+            return self.shared.getstate()
+        return (self.sensors.counter, self.colors.counter, self.spawn.counter,
+                tuple((index, stream.counter) for index, stream in self._cars.items()))
+
+    def setstate(self, state):
+        """Restore a state returned by getstate."""
+        if self.shared is not None:
+            self.shared.setstate(state)
+            return
+        self.sensors.counter, self.colors.counter, self.spawn.counter, cars = state
+        for index, counter in cars:
+            self.jitter(index).counter = counter
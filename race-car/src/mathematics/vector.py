@@ -1,7 +1,10 @@
 import math
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
 class Vector:
+    __slots__ = ("x", "y")
+
     def __init__(self, x: float = 0, y: float = 0):
         """
         Initialize a Vector object.
@@ -101,11 +104,78 @@ class Vector:
         :param degrees: The angle to rotate by, in degrees.
         :return: A new Vector with the rotated values.
         """
-        radians = math.radians(degrees)
-        return Vector(
-            math.cos(radians) * self.x - math.sin(radians) * self.y,
-            math.sin(radians) * self.x + math.cos(radians) * self.y
-        )
+        cos, sin = rotation(degrees)
+        return self.rotate_by(cos, sin)
+
+    def rotate_by(self, cos: float, sin: float):
+        """
+        Rotate the Vector by a precomputed rotation.
+
+        :param cos: The cosine of the angle, see rotation().
+        :param sin: The sine of the angle, see rotation().
+        :return: A new Vector with the rotated values.
+        """
+        return Vector(cos * self.x - sin * self.y, sin * self.x + cos * self.y)
+
+    def set(self, x: float, y: float):
+        """
+        Overwrite both coordinates in place.
+
+        :return: This Vector.
+        """
+        self.x = x
+        self.y = y
+        return self
+
+    def iadd(self, v):
+        """
+        Add another Vector or a scalar to this Vector in place.
+
+        :param v: A Vector or a scalar value.
+        :return: This Vector.
+        """
+        if isinstance(v, Vector):
+            self.x += v.x
+            self.y += v.y
+        else:
+            self.x += v
+            self.y += v
+        return self
+
+    def isub(self, v):
+        """
+        Subtract another Vector from this Vector in place.
+
+        :param v: A Vector to subtract.
+        :return: This Vector.
+        """
+        self.x -= v.x
+        self.y -= v.y
+        return self
+
+    def iscale(self, v: float):
+        """
+        Scale this Vector by a scalar value in place.
+
+        :param v: The scalar value to scale by.
+        :return: This Vector.
+        """
+        self.x *= v
+        self.y *= v
+        return self
+
+    def irotate_by(self, cos: float, sin: float):
+        """
+        Rotate this Vector by a precomputed rotation in place.
+
+        :param cos: The cosine of the angle, see rotation().
+        :param sin: The sine of the angle, see rotation().
+        :return: This Vector.
+        """
+        x = self.x
+        self.x = cos * x - sin * self.y
+        self.y = sin * x + cos * self.y
+        return self
 
     def distance(self, v):
         """
@@ -114,4 +184,16 @@ class Vector:
         :param v: Another Vector.
         :return: The distance as a float.
         """
-        return math.sqrt((v.x - self.x) ** 2 + (v.y - self.y) ** 2)
\ No newline at end of file
+        return math.sqrt((v.x - self.x) ** 2 + (v.y - self.y) ** 2)
+
+
+@lru_cache(maxsize=None)
+def rotation(degrees: float) -> Tuple[float, float]:
+    """
+    Return the (cos, sin) of an angle in degrees, computed once per angle.
+
+    :param degrees: The angle in degrees.
+    :return: The cosine and sine of the angle.
+    """
+    radians = math.radians(degrees)
+    return math.cos(radians), math.sin(radians)